@@ -1,10 +1,12 @@
 from macpacking.model import BinPacker
-from utils.algo_runner import run_in_folder
+from utils.algo_runner import run_all
 from utils.plot_util import set_attributes, gen_color
-from macpacking.reader import OracleReader
+from macpacking.catalog import catalog
+from macpacking.bounds import lower_bound
+from macpacking.solution import bin_loads
+from macpacking.kpi import kpis, KpiAccumulator
 from utils.algo_util import get_algo_name
 import matplotlib.pyplot as plt
-from statistics import stdev
 
 
 class BenchMarking():
@@ -21,16 +23,13 @@ class BenchMarking():
         self.c_range = (min_c, max_c)
         self.w_range = (min_w, max_w)
 
-        # All results for online and offline algorithms
-        # e.g., {NextFit: {(1, 1, 1): [[23, 24, 22],
-        #                              [12.3, 15.3, 13.8],
-        #                              [5.4, 3.1, 6.2]],
-        #                  (2, 1, 1): [[...], [...], [...]]}}
+        # Running KPI statistics for online and offline algorithms
+        # e.g., {NextFit: {(1, 1, 1): KpiAccumulator(),
+        #                  (2, 1, 1): KpiAccumulator()}}
         # Each tuple indicates different N_C_W_ folder
         self.bench_result:\
-            dict[BinPacker: dict[tuple[int, int, int]:
-                                 [list[int], list[float], list[float]]]] =\
-            {get_algo_name(algo): {(n, c, w): [[], [], []]
+            dict[BinPacker: dict[tuple[int, int, int]: KpiAccumulator]] =\
+            {get_algo_name(algo): {(n, c, w): KpiAccumulator()
                                    for n in range(min_n, max_n + 1)
                                    for c in range(min_c, max_c + 1)
                                    for w in range(min_w, max_w + 1)}
@@ -54,31 +53,36 @@ class BenchMarking():
         # get algorithms' results
         for algo in self.algos:
             name = get_algo_name(algo)
+            mean = self.bench_result[name][param].mean()
             # Calculate average number of bins
-            bins = self.bench_result[name][param][0]
-            avg_bins = sum(bins) / len(bins)
             substr = f'{"average number of bins:":<33}'
-            print(f'{name:<25} {substr} {avg_bins:>10}')
+            print(f'{name:<25} {substr} {mean.bins:>10}')
 
-            self.num_bins[name].append(avg_bins)
+            self.num_bins[name].append(mean.bins)
 
             # Calculate average unused room in bins
-            cp_diff = self.bench_result[name][param][1]
-            avg_cp_diff = sum(cp_diff) / len(cp_diff)
             substr = f'{"average unused room:":<33}'
             print(
-                f'{"":<25} {substr} {round(avg_cp_diff, 2):>10}')
+                f'{"":<25} {substr} {round(mean.unused, 2):>10}')
 
-            self.cp_diff[name].append(avg_cp_diff)
+            self.cp_diff[name].append(mean.unused)
 
             # Calculate average standard deviation for loads
-            stdevs = self.bench_result[name][param][2]
-            avg_stdev = sum(stdevs) / len(stdevs)
             substr = f'{"standard deviation of loads:":<33}'
             print(
-                f'{"":<25} {substr} {round(avg_stdev, 2):>10}')
+                f'{"":<25} {substr} {round(mean.load_std, 2):>10}')
 
-            self.avg_load[name].append(avg_stdev)
+            self.avg_load[name].append(mean.load_std)
+
+            # Other KPIs, printed only
+            substr = f'{"average fill ratio:":<33}'
+            print(f'{"":<25} {substr} {round(mean.fill, 4):>10}')
+            substr = f'{"average bins over lower bound:":<33}'
+            print(f'{"":<25} {substr} {round(mean.waste, 2):>10}')
+            substr = f'{"max / min load:":<33}'
+            loads = self.bench_result[name][param]
+            extremes = f'{loads["max_load"].max} / {loads["min_load"].min}'
+            print(f'{"":<25} {substr} {extremes:>10}')
 
     def do_benchmark(self, nob=True, ur=True, stdv=True) -> None:
         '''
@@ -99,22 +103,17 @@ class BenchMarking():
                     print(f'****** {s} ******')
                     # Get file paths
                     folder = get_folder(n, c, w)
-                    # run algorithm
-                    for algo in self.algos:
-                        name = get_algo_name(algo)
-                        result = run_in_folder(
-                            algo, f'binpp/{folder}', get_fixed_bins(folder))
-                        for sol in list(result.values()):
-                            cp_list = [cp - sum(bin) for bin in sol]
-                            avg_cp_diff = sum(cp_list) / len(cp_list)
-                            load_list = [sum(bin) for bin in sol]
-                            # Record the results
-                            self.bench_result[name][(n, c, w)][0].append(
-                                len(sol))
-                            self.bench_result[name][(n, c, w)][1].append(
-                                avg_cp_diff)
-                            self.bench_result[name][(n, c, w)][2].append(
-                                stdev(load_list))
+                    # run every algorithm on each instance, read once
+                    bins = get_fixed_bins(folder)
+                    bounds = get_bounds(folder)
+                    results = run_all([(algo, f'binpp/{folder}', bins)
+                                       for algo in self.algos])
+                    for algo, result in zip(self.algos, results):
+                        # Record the results, one pass over the bin loads
+                        stats = self.bench_result[get_algo_name(algo)]
+                        for sol, bound in zip(result.values(), bounds):
+                            stats[(n, c, w)].add(
+                                kpis(bin_loads(sol), cp, bound))
 
                     # Analyze the results
                     self.get_result((n, c, w))
@@ -288,8 +287,22 @@ def check_min_weight(w: int) -> int:
 
 def get_fixed_bins(folder_name: str) -> list[int]:
     '''
-        Extract optimal results from the oracle files
+        Extract optimal results from the dataset catalog, in the order the
+        files of the folder are run, falling back on a lower bound for
+        instances without an oracle entry
+    '''
+    bins = []
+    for entry in catalog().folder(f'binpp/{folder_name}'):
+        if entry.optimum is not None:
+            bins.append(entry.optimum)
+        else:
+            bins.append(lower_bound(entry.open().offline()))
+    return bins
+
+
+def get_bounds(folder_name: str) -> list[int]:
+    '''
+        Lower bounds of the instances of a folder, in the order they are run
     '''
-    reader = OracleReader('Binpp')
-    op_results = reader.read_file()
-    return [value for key, value in op_results.items() if folder_name in key]
+    return [lower_bound(entry.open().offline())
+            for entry in catalog().folder(f'binpp/{folder_name}')]
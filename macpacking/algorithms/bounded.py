@@ -0,0 +1,182 @@
+from typing import Callable, Iterator
+from abc import ABC, abstractmethod
+from .. import Solution, WeightStream
+from ..model import Online
+import json
+
+# A closed bin handed to a sink: (bin index, items of the bin)
+ClosedBin = tuple[int, list[int]]
+
+# A sink receives every closed bin, e.g. list.append, a primed generator's
+# send method, or a JsonlSink
+Sink = Callable[[ClosedBin], None]
+
+
+class JsonlSink():
+    '''Sink writing one JSON object per closed bin to a file'''
+
+    def __init__(self, filename: str) -> None:
+        self.__file = open(filename, 'w')
+
+    def __call__(self, closed: ClosedBin) -> None:
+        bin_index, items = closed
+        self.__file.write(json.dumps({'bin': bin_index, 'items': items}))
+        self.__file.write('\n')
+
+    def close(self) -> None:
+        self.__file.close()
+
+    def __enter__(self) -> 'JsonlSink':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class BoundedSession(ABC):
+    '''
+        Incremental packing session keeping at most k bins open: when a
+        new bin is needed and k bins are already open, one of them is
+        closed and handed to the sink, so the memory used does not depend
+        on the stream length. Unlike a Session, it never holds the whole
+        solution: snapshot() returns the open bins only, and close() and
+        feed() return the number of bins used.
+    '''
+
+    def __init__(self, capacity: int, k: int, sink: Sink) -> None:
+        self.capacity = capacity
+        self.closed = False
+        self.k = k
+        self.sink = sink
+        # open bins, oldest first: [bin index, items, remaining]
+        self.open_bins = [[0, [], capacity]]
+        self.count = 1
+
+    def push(self, w: int) -> int:
+        '''Place an item, return the index of its bin'''
+        if self.closed:
+            raise ValueError('The session is closed')
+        return self._push(w)
+
+    def feed(self, stream: Iterator[int]) -> int:
+        '''Push every item of a stream, then close the session'''
+        push = self.push
+        for w in stream:
+            push(w)
+        return self.close()
+
+    def _push(self, w: int) -> int:
+        position = self._choose(w)
+        if position == -1:
+            if len(self.open_bins) == self.k:
+                self._flush(self._victim())
+            self.open_bins.append([self.count, [], self.capacity])
+            self.count += 1
+            position = len(self.open_bins) - 1
+        target = self.open_bins[position]
+        target[1].append(w)
+        target[2] -= w
+        return target[0]
+
+    def snapshot(self) -> Solution:
+        '''Bins still open, oldest first'''
+        return [list(items) for _, items, _ in self.open_bins]
+
+    def close(self) -> int:
+        '''Flush the open bins and return the number of bins used'''
+        if not self.closed:
+            while self.open_bins:
+                self._flush(0)
+            self.closed = True
+        return self.count
+
+    def _flush(self, position: int) -> None:
+        bin_index, items, _ = self.open_bins.pop(position)
+        self.sink((bin_index, items))
+
+    @abstractmethod
+    def _choose(self, w: int) -> int:
+        '''Position of the open bin receiving w, -1 to open a new bin'''
+        pass
+
+    @abstractmethod
+    def _victim(self) -> int:
+        '''Position of the open bin to close when a new bin is needed'''
+        pass
+
+
+class FirstKFitSession(BoundedSession):
+
+    def _choose(self, w: int) -> int:
+        # oldest open bin that can hold the item
+        for position, (_, _, remaining) in enumerate(self.open_bins):
+            if remaining >= w:
+                return position
+        return -1
+
+    def _victim(self) -> int:
+        # close the oldest open bin
+        return 0
+
+
+class BestKFitSession(BoundedSession):
+
+    def _choose(self, w: int) -> int:
+        # tightest open bin that can hold the item, newest one on ties
+        best = -1
+        for position, (_, _, remaining) in enumerate(self.open_bins):
+            if w <= remaining and \
+                    (best == -1 or remaining <= self.open_bins[best][2]):
+                best = position
+        return best
+
+    def _victim(self) -> int:
+        # close the fullest open bin, the oldest one on ties
+        spaces = [remaining for _, _, remaining in self.open_bins]
+        return spaces.index(min(spaces))
+
+
+class BoundedOnline(Online):
+    '''
+        k-bounded-space online algorithms. Closed bins are handed to the
+        sink as soon as they are closed. Without a sink they are collected
+        and returned as the solution; with one, the items are packed with
+        open(capacity).feed(stream), which returns the number of bins, and
+        calling the algorithm is an error. With k = 1 both variants are
+        NextFit.
+    '''
+
+    def __init__(self, k: int = 2, sink: Sink = None) -> None:
+        if k < 1:
+            raise ValueError('At least one bin must stay open')
+        self.k = k
+        self.sink = sink
+
+    def _process(self, capacity: int, stream: WeightStream) -> Solution:
+        if self.sink is not None:
+            raise ValueError('The bins are handed to the sink: pack the '
+                             'items with open(capacity).feed(stream)')
+        closed_bins = []
+        self._session(capacity, closed_bins.append).feed(stream)
+        return [items for _, items in sorted(closed_bins)]
+
+    def _open(self, capacity: int) -> BoundedSession:
+        if self.sink is None:
+            raise ValueError('A bounded session needs a sink')
+        return self._session(capacity, self.sink)
+
+    @abstractmethod
+    def _session(self, capacity: int, sink: Sink) -> BoundedSession:
+        pass
+
+
+class FirstKFit(BoundedOnline):
+
+    def _session(self, capacity: int, sink: Sink) -> BoundedSession:
+        return FirstKFitSession(capacity, self.k, sink)
+
+
+class BestKFit(BoundedOnline):
+
+    def _session(self, capacity: int, sink: Sink) -> BoundedSession:
+        return BestKFitSession(capacity, self.k, sink)
@@ -0,0 +1,334 @@
+from bisect import bisect_left
+from math import ceil, floor
+from sys import getrecursionlimit, setrecursionlimit
+from threading import Event
+from time import perf_counter
+from typing import Iterator
+from .. import Solution, WeightSet
+from ..model import Offline
+from ..bounds import lower_bound, l2, reduce
+from .offline import FirstFit, BestFit
+import numpy as np
+
+# Tolerance of the floating point computations of the LP relaxation
+EPSILON = 1e-9
+
+
+class BudgetExceeded(Exception):
+    '''Raised internally when the search runs out of time or nodes'''
+    pass
+
+
+class BranchAndBound(Offline):
+    '''
+        Exact solver. The best of FirstFit/BestFit decreasing is the first
+        incumbent and the Martello-Toth reduction fixes bins belonging to
+        an optimal solution. The other items go through three stages:
+        - the LP relaxation (Gilmore-Gomory, by column generation) raises
+          the lower bound, and rounding its solution down, the items left
+          being packed greedily, gives a new incumbent;
+        - a bin completion search packs the items left by the rounding
+          in the bins the lower bound allows;
+        - otherwise, bin completion searches a packing of all the items
+          in as many bins as the lower bound, which is raised each time
+          the search proves there is none.
+        Bin completion fills one bin at a time, around its largest item,
+        with undominated sets of items only, largest items first, prunes
+        with the L2 bound of the items left and with the room the bins may
+        leave unused, and remembers the states that failed.
+        When the time or node budget runs out, or the cancel event (which
+        may be shared with other processes) is set, the best solution
+        found is returned and the proven flag stays False.
+    '''
+
+    def __init__(self, time_budget: float = 5.0,
+                 node_budget: int = None, cancel: Event = None) -> None:
+        self.time_budget = time_budget    # in seconds
+        self.node_budget = node_budget
+        self.cancel = cancel
+        self.proven = False
+        self.bound = 0
+        self.nodes = 0
+
+    def _process(self, capacity: int, weights: WeightSet) -> Solution:
+        self.__capacity = capacity
+        self.__deadline = perf_counter() + self.time_budget
+        self.nodes = 0
+        self.proven = False
+        self.bound = lower_bound((capacity, weights))
+
+        best = _greedy(capacity, weights)
+        if len(best) <= self.bound:
+            self.proven = True
+            return best
+
+        # the bins fixed by the reduction belong to an optimal solution,
+        # only the other items are searched
+        fixed, items = reduce(capacity, weights)
+        limit = getrecursionlimit()
+        setrecursionlimit(max(limit, len(items) + 100))
+        try:
+            best = self._solve(fixed, items, best)
+        except BudgetExceeded:
+            best = self.__best
+        finally:
+            setrecursionlimit(limit)
+        return best
+
+    def _solve(self, fixed: Solution, items: list[int],
+               best: Solution) -> Solution:
+        capacity = self.__capacity
+        self.__best = best
+        goal = self.bound - len(fixed)
+
+        bound, rounded, residual = self._relaxation(
+            items, len(best) - len(fixed) - 1)
+        goal = max(goal, bound)
+        self.bound = len(fixed) + goal
+        self._improve(fixed + rounded + _greedy(capacity, residual))
+        if len(self.__best) <= self.bound:
+            self.proven = True
+            return self.__best
+
+        # complete the rounded solution
+        found = self._complete(residual, goal - len(rounded))
+        if found is not None:
+            self._improve(fixed + rounded + found)
+            self.proven = True
+            return self.__best
+
+        # search every item, one more bin each time there is no packing
+        while len(fixed) + goal < len(self.__best):
+            found = self._complete(items, goal)
+            if found is not None:
+                self._improve(fixed + found)
+                break
+            goal += 1
+            self.bound = len(fixed) + goal
+        self.proven = True
+        return self.__best
+
+    def _improve(self, solution: Solution) -> None:
+        if len(solution) < len(self.__best):
+            self.__best = solution
+
+    def _check_budget(self) -> None:
+        self.nodes += 1
+        if self.nodes % 256 == 0 and self._expired():
+            raise BudgetExceeded()
+        if self.node_budget is not None and self.nodes > self.node_budget:
+            raise BudgetExceeded()
+
+    def _expired(self) -> bool:
+        return perf_counter() > self.__deadline or \
+            (self.cancel is not None and self.cancel.is_set())
+
+    def _relaxation(self, items: list[int], target: int) \
+            -> tuple[int, Solution, list[int]]:
+        '''
+            Lower bound from the LP relaxation, with the bins and the items
+            left when its solution is rounded down. Column generation stops
+            at the optimum, at the deadline, or as soon as the bound
+            exceeds target.
+        '''
+        capacity = self.__capacity
+        sizes = sorted(set(items), reverse=True)
+        index = {w: i for i, w in enumerate(sizes)}
+        demands = [0] * len(sizes)
+        for w in items:
+            demands[index[w]] += 1
+        if not sizes:
+            return 0, [], []
+        d = np.array(demands, dtype=np.float64)
+        # first basis: each size alone, as many times as a bin holds it
+        diagonal = np.minimum(d, [capacity // w for w in sizes])
+        inverse = np.diag(1 / diagonal)
+        x = d / diagonal
+        patterns = [np.diag(diagonal)[i] for i in range(len(sizes))]
+        bound = 0
+        while not self._expired():
+            # duals of the master, and the best pattern they price
+            y = inverse.sum(axis=0)
+            value, pattern = _knapsack(capacity, sizes, demands, y)
+            if value > EPSILON:
+                # Farley bound: valid for any dual solution
+                bound = max(bound, ceil(float(d @ y) / value - 1e-6))
+            if value <= 1 + EPSILON or bound > target:
+                break
+            u = inverse @ pattern
+            ratios = np.full(len(sizes), np.inf)
+            positive = u > EPSILON
+            if not positive.any():
+                break
+            ratios[positive] = x[positive] / u[positive]
+            row = int(np.argmin(ratios))
+            x -= ratios[row] * u
+            x[row] = ratios[row]
+            pivot = inverse[row] / u[row]
+            inverse -= np.outer(u, pivot)
+            inverse[row] = pivot
+            patterns[row] = pattern
+
+        # every pattern is used as many whole times as the items allow
+        left = list(demands)
+        rounded = []
+        for pattern, times in zip(patterns, x):
+            counts = pattern.astype(int).tolist()
+            for _ in range(max(0, floor(times + EPSILON))):
+                if any(c > n for c, n in zip(counts, left)):
+                    break
+                left = [n - c for c, n in zip(counts, left)]
+                rounded.append([w for w, c in zip(sizes, counts)
+                                for _ in range(c)])
+        residual = [w for w, n in zip(sizes, left) for _ in range(n)]
+        return bound, rounded, residual
+
+    def _complete(self, items: list[int], bins: int) -> Solution:
+        '''Packing of the items in the given number of bins, or None'''
+        self.__sizes = sorted(set(items), reverse=True)
+        index = {w: i for i, w in enumerate(self.__sizes)}
+        self.__counts = [0] * len(self.__sizes)
+        for w in items:
+            self.__counts[index[w]] += 1
+        self.__failed = set()
+        self.__bins = []
+        room = bins * self.__capacity - sum(items)
+        if room < 0 or not self._search(bins, room):
+            return None
+        return self.__bins
+
+    def _search(self, bins: int, room: int) -> bool:
+        '''
+            Fill bins one by one, around the largest item left; room is
+            the space the bins may still leave unused
+        '''
+        self._check_budget()
+        counts = self.__counts
+        first = next((i for i, n in enumerate(counts) if n), -1)
+        if first == -1:
+            return True
+        if bins == 0:
+            return False
+        key = (bins, tuple(counts))
+        if key in self.__failed:
+            return False
+        left = [w for w, n in zip(self.__sizes, counts) for _ in range(n)]
+        if l2(self.__capacity, left) > bins:
+            self.__failed.add(key)
+            return False
+
+        largest = self.__sizes[first]
+        counts[first] -= 1
+        space = self.__capacity - largest
+        # the completions take their items out of counts while they are
+        # searched
+        for fill, chosen in self._completions(space, room):
+            self.__bins.append([largest] + chosen)
+            if self._search(bins - 1, room - (space - fill)):
+                return True
+            self.__bins.pop()
+        counts[first] += 1
+        self.__failed.add(key)
+        return False
+
+    def _completions(self, space: int, room: int) \
+            -> Iterator[tuple[int, list[int]]]:
+        '''
+            Undominated sets of items filling a bin with the given space,
+            wasting at most room, the largest items first
+        '''
+        sizes, counts = self.__sizes, self.__counts
+        n = len(sizes)
+        start = bisect_left([-w for w in sizes], -space)
+        # weight of the items of index j and more
+        available = [0] * (n + 1)
+        for j in range(n - 1, -1, -1):
+            available[j] = available[j + 1] + sizes[j] * counts[j]
+        chosen = []
+
+        def extend(j: int, free: int) -> Iterator[tuple[int, list[int]]]:
+            fill = space - free
+            if fill + min(available[j], free) < space - room:
+                return
+            while j < n and (sizes[j] > free or counts[j] == 0):
+                j += 1
+            if j == n:
+                self._check_budget()
+                if self._undominated(chosen, free):
+                    yield fill, list(chosen)
+                return
+            w = sizes[j]
+            for k in range(min(counts[j], free // w), -1, -1):
+                # an item left out must not fit in the end
+                if k < counts[j] and free - k * w - available[j + 1] >= w:
+                    break
+                chosen.extend([w] * k)
+                counts[j] -= k
+                yield from extend(j + 1, free - k * w)
+                counts[j] += k
+                del chosen[len(chosen) - k:]
+
+        return extend(start, space)
+
+    def _undominated(self, chosen: list[int], free: int) -> bool:
+        '''
+            False when an item left out can replace a subset of the chosen
+            ones of smaller weight and still fit, or of the same weight
+            but several items: that set is then at least as good
+        '''
+        # bitsets of the sums of the subsets of the chosen items: any
+        # subset, at least one item, at least two items
+        every, one, two = 1, 0, 0
+        for w in chosen:
+            two |= (two << w) | (one << w)
+            one |= every << w
+            every |= every << w
+        for w, n in zip(self.__sizes, self.__counts):
+            if n == 0:
+                continue
+            low = max(0, w - free)
+            if every & (((1 << w) - 1) >> low << low) or (two >> w) & 1:
+                return False
+        return True
+
+
+def _greedy(capacity: int, weights: list[int]) -> Solution:
+    # best of the greedy decreasing heuristics, without empty bins
+    if not weights:
+        return []
+    candidates = [FirstFit()((capacity, weights)),
+                  BestFit()((capacity, weights))]
+    return min([[b for b in c if b] for c in candidates], key=len)
+
+
+def _knapsack(capacity: int, sizes: list[int], demands: list[int],
+              values: np.ndarray) -> tuple[float, np.ndarray]:
+    # most valuable pattern: at most demands[i] items of size sizes[i]
+    # in a bin, by dynamic programming on binary splits of the demands
+    parts = []
+    for i, (w, n) in enumerate(zip(sizes, demands)):
+        k = 1
+        while n > 0 and values[i] > EPSILON:
+            parts.append((i, min(k, n)))
+            n -= min(k, n)
+            k *= 2
+    best = np.zeros(capacity + 1)
+    taken = []
+    for i, k in parts:
+        w = sizes[i] * k
+        if w > capacity:
+            taken.append(None)
+            continue
+        candidate = best[:capacity + 1 - w] + values[i] * k
+        better = candidate > best[w:] + EPSILON
+        best[w:] = np.where(better, candidate, best[w:])
+        taken.append(better)
+    load = int(np.argmax(best))
+    value = float(best[load])
+    pattern = np.zeros(len(sizes))
+    for (i, k), better in zip(reversed(parts), reversed(taken)):
+        w = sizes[i] * k
+        if better is not None and load >= w and better[load - w]:
+            pattern[i] += k
+            load -= w
+    return value, pattern
@@ -0,0 +1,141 @@
+from abc import abstractmethod
+from collections import Counter
+from .. import Solution
+from ..model import Offline
+from .structures import ResidualTree, ResidualIndex
+
+# A weight histogram: (weight, multiplicity) pairs, heaviest weight first
+Histogram = list[tuple[int, int]]
+
+
+def compress(weights: list[int]) -> Histogram:
+    '''
+        Compress a list of weights into (weight, multiplicity) pairs,
+        sorted by decreasing weight
+    '''
+    return sorted(Counter(weights).items(), reverse=True)
+
+
+def fit_count(residual: int, w: int, count: int, strict: bool) -> int:
+    '''
+        Number of items of weight w (at most count) that can be added to a
+        bin with the given residual capacity
+    '''
+    if w <= 0:
+        return count
+    if strict:
+        # load + w < capacity must hold after every insertion
+        fits = -(-residual // w) - 1
+    else:
+        fits = residual // w
+    return min(count, int(fits))
+
+
+def split_run(capacity: int, w: int, count: int,
+              strict: bool) -> tuple[int, int, int]:
+    '''
+        Split a run of count items of weight w over new bins, each new bin
+        being filled before the next one is opened. Return the number of
+        items per full bin, the number of full bins and the number of items
+        left for the last, partially filled, bin
+    '''
+    per_bin = 1 + max(0, fit_count(capacity - w, w, count - 1, strict))
+    return per_bin, count // per_bin, count % per_bin
+
+
+class HistogramOffline(Offline):
+    '''
+        Offline algorithms working on runs of equal weights: the weights
+        are compressed into a histogram and a whole run is placed in a bin
+        at once, so the work depends on the number of distinct weights and
+        of bins rather than on the number of items. The bins are identical
+        to the ones of the item-by-item decreasing variant.
+    '''
+
+    def _process(self, capacity: int, weights: list[int]) -> Solution:
+        return self.pack(capacity, compress(weights))
+
+    @abstractmethod
+    def pack(self, capacity: int, histogram: Histogram) -> Solution:
+        '''Pack a histogram sorted by decreasing weight'''
+        pass
+
+
+class HistogramNextFit(HistogramOffline):
+
+    def pack(self, capacity: int, histogram: Histogram) -> Solution:
+        '''NextFit decreasing, same bins as offline NextFit'''
+        solution = [[]]
+        remaining = capacity
+        for w, count in histogram:
+            while count:
+                if remaining >= w:
+                    placed = fit_count(remaining, w, count, False)
+                    solution[-1].extend([w] * placed)
+                    remaining -= placed * w
+                    count -= placed
+                else:
+                    per_bin, full, rest = split_run(capacity, w, count, False)
+                    solution.extend([w] * per_bin for _ in range(full))
+                    remaining = capacity - per_bin * w
+                    if rest:
+                        solution.append([w] * rest)
+                        remaining = capacity - rest * w
+                    count = 0
+        return solution
+
+
+class HistogramFirstFit(HistogramOffline):
+
+    def pack(self, capacity: int, histogram: Histogram) -> Solution:
+        '''FirstFit decreasing, same bins as offline FirstFit'''
+        solution = [[]]
+        residuals = ResidualTree()
+        residuals.append(capacity)
+        for w, count in histogram:
+            while count:
+                bin_index = residuals.first_above(w)
+                # no bin can hold this weight anymore: the rest of the run
+                # goes to new bins, each one filled before the next is opened
+                if bin_index == -1:
+                    per_bin, full, rest = split_run(capacity, w, count, True)
+                    solution.extend([w] * per_bin for _ in range(full))
+                    residuals.extend(capacity - per_bin * w, full)
+                    if rest:
+                        solution.append([w] * rest)
+                        residuals.append(capacity - rest * w)
+                    break
+                placed = fit_count(residuals[bin_index], w, count, True)
+                solution[bin_index].extend([w] * placed)
+                residuals[bin_index] -= placed * w
+                count -= placed
+        return solution
+
+
+class HistogramBestFit(HistogramOffline):
+
+    def pack(self, capacity: int, histogram: Histogram) -> Solution:
+        '''BestFit decreasing, same bins as offline BestFit'''
+        solution = [[]]
+        residuals = ResidualIndex()
+        residuals.add(0, capacity)
+        for w, count in histogram:
+            while count:
+                bin_index, remaining = residuals.pop_best(w)
+                # the tightest bin stays the tightest one while the run
+                # fits, so it takes as many items of the run as possible
+                if bin_index == -1:
+                    per_bin, full, rest = split_run(capacity, w, count, False)
+                    start = len(solution)
+                    solution.extend([w] * per_bin for _ in range(full))
+                    residuals.add_range(start, len(solution),
+                                        capacity - per_bin * w)
+                    if rest:
+                        residuals.add(len(solution), capacity - rest * w)
+                        solution.append([w] * rest)
+                    break
+                placed = fit_count(remaining, w, count, False)
+                solution[bin_index].extend([w] * placed)
+                residuals.add(bin_index, remaining - placed * w)
+                count -= placed
+        return solution
@@ -0,0 +1,120 @@
+from random import Random
+from threading import Event
+from time import perf_counter
+from typing import Union
+from .. import Solution, WeightSet
+from ..model import Offline
+from ..bounds import lower_bound
+
+
+class Improved(Offline):
+    '''
+        Anytime improvement stage around any offline algorithm. Its
+        solution is taken as a start, then the least-filled bin is
+        emptied by moving its items to other bins, or by swapping them
+        with smaller items of other bins, until the time budget runs out
+        or the lower bound is met. When a bin cannot be emptied, random
+        feasible swaps between other bins perturb the solution before
+        trying again. The best solution found so far is kept in `best`;
+        stop() interrupts the search from another thread, and so does
+        setting the cancel event, which may be shared with other
+        processes (e.g., a multiprocessing Manager's Event).
+    '''
+
+    def __init__(self, algo: Union[type[Offline], Offline],
+                 budget_ms: float = 50, seed: int = 42,
+                 cancel: Event = None) -> None:
+        self.algo = algo() if isinstance(algo, type) else algo
+        self.budget_ms = budget_ms
+        self.seed = seed
+        self.cancel = cancel
+        self.best: Solution = []
+        self.__stopped = False
+
+    def stop(self) -> None:
+        '''Interrupt the search, the best solution so far is returned'''
+        self.__stopped = True
+
+    def _process(self, capacity: int, weights: WeightSet) -> Solution:
+        deadline = perf_counter() + self.budget_ms / 1000
+        self.__stopped = False
+        self.__capacity = capacity
+        self.__random = Random(self.seed)
+        bins = [list(b) for b in self.algo((capacity, weights)) if b]
+        self.best = [list(b) for b in bins]
+        bound = lower_bound((capacity, weights))
+        loads = [sum(b) for b in bins]
+
+        rounds = 0
+        while len(self.best) > bound and not self.__stopped \
+                and perf_counter() < deadline:
+            rounds += 1
+            # a shared event costs a round trip to its manager
+            if self.cancel is not None and rounds % 16 == 0 \
+                    and self.cancel.is_set():
+                break
+            target = loads.index(min(loads))
+            if self._empty(bins, loads, target):
+                del bins[target]
+                del loads[target]
+                self.best = [list(b) for b in bins]
+            else:
+                self._perturb(bins, loads, target)
+        return self.best
+
+    def _empty(self, bins: Solution, loads: list[int], target: int) -> bool:
+        '''Try to empty the target bin, return True on success'''
+        capacity = self.__capacity
+        progress = True
+        while bins[target] and progress:
+            progress = False
+            for x in sorted(bins[target], reverse=True):
+                # move: fullest other bin with room for x
+                fullest = -1
+                for k, load in enumerate(loads):
+                    if k != target and load + x <= capacity and \
+                            (fullest == -1 or load > loads[fullest]):
+                        fullest = k
+                if fullest != -1:
+                    self._move(bins, loads, x, target, fullest)
+                    progress = True
+                    break
+                # swap: x with a smaller item y of another bin, filling
+                # that bin as much as possible and lightening the target
+                swap, gain = None, 0
+                for k, content in enumerate(bins):
+                    if k == target:
+                        continue
+                    for y in content:
+                        if y < x and loads[k] - y + x <= capacity and \
+                                loads[k] - y + x > gain:
+                            swap, gain = (k, y), loads[k] - y + x
+                if swap is not None:
+                    k, y = swap
+                    self._move(bins, loads, x, target, k)
+                    self._move(bins, loads, y, k, target)
+                    progress = True
+                    break
+        return not bins[target]
+
+    def _perturb(self, bins: Solution, loads: list[int], target: int) -> None:
+        '''Random feasible swaps between bins other than the target'''
+        capacity = self.__capacity
+        others = [k for k in range(len(bins)) if k != target]
+        if len(others) < 2:
+            return
+        for _ in range(len(others)):
+            a, b = self.__random.sample(others, 2)
+            x = self.__random.choice(bins[a])
+            y = self.__random.choice(bins[b])
+            if loads[a] - x + y <= capacity and loads[b] - y + x <= capacity:
+                self._move(bins, loads, x, a, b)
+                self._move(bins, loads, y, b, a)
+
+    @staticmethod
+    def _move(bins: Solution, loads: list[int], w: int,
+              source: int, destination: int) -> None:
+        bins[source].remove(w)
+        loads[source] -= w
+        bins[destination].append(w)
+        loads[destination] += w
@@ -1,61 +1,98 @@
+from heapq import heapify, heappop, heappush, heapreplace
 from .. import Solution, WeightSet
-from ..model import Offline, ExtendOffline
+from ..model import Offline, ExtendOffline, decreasing
 from .online import (NextFit as Nf_online, FirstFit as Ff_online,
                      BestFit as Bf_online, WorstFit as Wf_online)
 
 
 class NextFit(Offline):
+    '''An offline version of NextFit, ordering the weigh stream and
+    delegating to the online version (avoiding code duplication)'''
 
-    def _process(self, capacity: int, weights: WeightSet) -> Solution:
-        '''An offline version of NextFit, ordering the weigh stream and
-        delegating to the online version (avoiding code duplication)'''
-        weights = sorted(weights, reverse=True)
-        delegation = Nf_online()
-        return delegation((capacity, weights))
+    online = Nf_online
 
 
 class FirstFit(Offline):
+    '''An offline version of FirstFit, ordering the weigh stream and
+    delegating to the online version (avoiding code duplication)'''
 
-    def _process(self, capacity: int, weights: WeightSet) -> Solution:
-        '''An offline version of FirstFit, ordering the weigh stream and
-        delegating to the online version (avoiding code duplication)'''
-        weights = sorted(weights, reverse=True)
-        delegation = Ff_online()
-        return delegation((capacity, weights))
+    online = Ff_online
 
 
 class BestFit(Offline):
+    '''An offline version of BestFit, ordering the weigh stream and
+    delegating to the online version (avoiding code duplication)'''
 
-    def _process(self, capacity: int, weights: WeightSet) -> Solution:
-        '''An offline version of BestFit, ordering the weigh stream and
-        delegating to the online version (avoiding code duplication)'''
-        weights = sorted(weights, reverse=True)
-        delegation = Bf_online()
-        return delegation((capacity, weights))
+    online = Bf_online
 
 
 class WorstFit(Offline):
+    '''An offline version of WorstFit, ordering the weigh stream and
+    delegating to the online version (avoiding code duplication)'''
 
-    def _process(self, capacity: int, weights: WeightSet) -> Solution:
-        '''An offline version of WorstFit, ordering the weigh stream and
-        delegating to the online version (avoiding code duplication)'''
-        weights = sorted(weights, reverse=True)
-        delegation = Wf_online()
-        return delegation((capacity, weights))
+    online = Wf_online
 
 
 class GNP(ExtendOffline):
 
     def _process(self, weights: WeightSet, num_of_bins: int) -> Solution:
         '''Algorithms for Multiway Number Partitioning'''
-        weights = sorted(weights, reverse=True)
+        weights = decreasing(weights)
         solutions = [[] for _ in range(num_of_bins)]
-        current_sums = [0 for _ in range(num_of_bins)]
+        # min-heap of (current sum, bin index)
+        current_sums = [(0, index) for index in range(num_of_bins)]
         for w in weights:
             # add the current item to the bin with minimal weight
-            min_sum = min(current_sums)
-            index = current_sums.index(min_sum)
+            min_sum, index = current_sums[0]
             solutions[index].append(w)
-            current_sums[index] += w
+            heapreplace(current_sums, (min_sum + w, index))
 
         return solutions
+
+
+class KarmarkarKarp(ExtendOffline):
+
+    def _process(self, weights: WeightSet, num_of_bins: int) -> Solution:
+        '''Largest differencing method for Multiway Number Partitioning'''
+        # max-heap of partial partitions, keyed by the difference between
+        # their largest and smallest sums. A partition only lists its
+        # non-empty subsets as [sum, items], by decreasing sum, the other
+        # subsets being implicitly empty
+        heap = [(-w, order, [[w, [w]]]) for order, w in enumerate(weights)]
+        heapify(heap)
+        order = len(heap)
+        while len(heap) > 1:
+            _, _, first = heappop(heap)
+            _, _, second = heappop(heap)
+            merged = KarmarkarKarp._merge(first, second, num_of_bins)
+            spread = merged[0][0]
+            if len(merged) == num_of_bins:
+                spread -= merged[-1][0]
+            heappush(heap, (-spread, order, merged))
+            order += 1
+        solutions = heap[0][2] if heap else []
+        return [items for _, items in solutions] +\
+            [[] for _ in range(num_of_bins - len(solutions))]
+
+    @staticmethod
+    def _merge(first: list, second: list, num_of_bins: int) -> list:
+        # combine the largest sums of one partition with the smallest sums
+        # of the other one
+        if len(first) + len(second) <= num_of_bins:
+            merged = first + second
+        else:
+            merged = []
+            offset = num_of_bins - len(second)
+            for i in range(num_of_bins):
+                subset = first[i] if i < len(first) else [0, []]
+                if i >= offset:
+                    other_sum, other_items = second[num_of_bins - 1 - i]
+                    items = subset[1]
+                    # extend the longer list to keep merging cheap
+                    if len(items) < len(other_items):
+                        items, other_items = other_items, items
+                    items.extend(other_items)
+                    subset = [subset[0] + other_sum, items]
+                merged.append(subset)
+        merged.sort(key=lambda subset: subset[0], reverse=True)
+        return merged
@@ -1,153 +1,203 @@
-from .. import Solution, WeightStream
-from ..model import Online
+from array import array
+from heapq import heappush, heapreplace
+from typing import Iterator
+from ..model import Online, Session
+from ..solution import CompactSolution
 from .categorize import normalize
+from .structures import ResidualTree, ResidualIndex
 
 
 class NextFit(Online):
 
-    def _process(self, capacity: int, stream: WeightStream) -> Solution:
-        bin_index = 0
-        solution = [[]]
-        remaining = capacity
-        for w in stream:
-            if remaining >= w:
-                solution[bin_index].append(w)
-                remaining = remaining - w
-            else:
-                bin_index += 1
-                solution.append([w])
-                remaining = capacity - w
-        return solution
+    def _open(self, capacity: int) -> Session:
+        return NextFitSession(capacity)
+
+
+class NextFitSession(Session):
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity)
+        self.bin_index = self.solution.new_bin()
+        self.remaining = capacity
+
+    def _push(self, w: int) -> int:
+        if self.remaining >= w:
+            self.remaining -= w
+        else:
+            self.bin_index = self.solution.new_bin()
+            self.remaining = self.capacity - w
+        self.solution.place(w, self.bin_index)
+        return self.bin_index
 
 
 class WorstOnline(Online):
 
-    def _process(self, capacity: int, stream: WeightStream) -> Solution:
-        solution = []
+    def _open(self, capacity: int) -> Session:
+        return WorstOnlineSession(capacity)
+
+
+class WorstOnlineSession(Session):
+
+    def _push(self, w: int) -> int:
         # Create a bin for each item
-        for w in stream:
-            solution.append([w])
-        return solution
+        bin_index = self.solution.new_bin()
+        self.solution.place(w, bin_index)
+        return bin_index
 
 
 class FirstFit(Online):
 
-    def _process(self, capacity: int, stream: WeightStream) -> Solution:
-        solution = [[]]
-        for w in stream:
-            bin_index = 0
-            # From the first bin, find the bin where
-            # the current item can fit in
-            while bin_index < len(solution):
-                if sum(solution[bin_index]) + w < capacity:
-                    solution[bin_index].append(w)
-                    break
-                # Create a bin if no bin can hold the current item
-                if bin_index == len(solution) - 1:
-                    solution.append([w])
-                    break
-                bin_index += 1
-        return solution
+    def _open(self, capacity: int) -> Session:
+        return FirstFitSession(capacity)
+
+
+class FirstFitSession(Session):
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity)
+        # residual capacity of every bin, in bin order
+        self.residuals = ResidualTree()
+        self.residuals.append(capacity)
+        self.solution.new_bin()
+
+    def _push(self, w: int) -> int:
+        # From the first bin, find the bin where
+        # the current item can fit in
+        bin_index = self.residuals.first_above(w)
+        # Create a bin if no bin can hold the current item
+        if bin_index == -1:
+            bin_index = self.residuals.append(self.capacity)
+            self.solution.new_bin()
+        self.solution.place(w, bin_index)
+        self.residuals[bin_index] -= w
+        return bin_index
 
 
 class BestFit(Online):
 
-    def _process(self, capacity: int, stream: WeightStream) -> Solution:
-        solution = [[[], capacity]]
-        for w in stream:
-            min_diff = capacity
-            insert_index = -1
-            bin_index = 0
-            # find the bin with the maximum load which the item can fit in
-            while bin_index < len(solution):
-                # Check if the current bin is the best bin to insert the item
-                if solution[bin_index][1] <= min_diff:
-                    # Check if the item fits into the bin
-                    if solution[bin_index][1] - w >= 0:
-                        insert_index = bin_index
-                        min_diff = solution[bin_index][1]
-                bin_index += 1
-            # Create a new bin if the current item fits into no bin
-            if insert_index == -1:
-                solution.append([[w], capacity - w])
-            # Insert the item into the appropriate bin
-            else:
-                solution[insert_index][0].append(w)
-                solution[insert_index][1] -= w
-        return [s[0] for s in solution]
+    def _open(self, capacity: int) -> Session:
+        return BestFitSession(capacity)
+
+
+class BestFitSession(Session):
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity)
+        # bins ordered by their remaining capacity
+        self.residuals = ResidualIndex()
+        self.residuals.add(self.solution.new_bin(), capacity)
+
+    def _push(self, w: int) -> int:
+        # find the bin with the maximum load which the item can fit in
+        bin_index, remaining = self.residuals.pop_best(w)
+        # Create a new bin if the current item fits into no bin
+        if bin_index == -1:
+            bin_index = self.solution.new_bin()
+            remaining = self.capacity
+        # Insert the item into the appropriate bin
+        self.solution.place(w, bin_index)
+        self.residuals.add(bin_index, remaining - w)
+        return bin_index
 
 
 class WorstFit(Online):
 
-    def _process(self, capacity: int, stream: WeightStream) -> Solution:
-        solution = [[[], capacity]]
-        for w in stream:
-            bin_index = 0
-            max_space = -1
-            max_index = 0
-            # find the bin with the maximum unused space
-            # which the item can fit in
-            while bin_index < len(solution):
-                c = solution[bin_index][1]
-                if c >= w and c - w > max_space:
-                    # store the bin's index and max_space
-                    max_index = bin_index
-                    max_space = c - w
-                bin_index += 1
-            # if not find such a bin, create new bin
-            if max_space == -1:
-                solution.append([[w], capacity - w])
-            # insert the item into the correct bin
-            else:
-                solution[max_index][0].append(w)
-                solution[max_index][1] -= w
-        return [s[0] for s in solution]
+    def _open(self, capacity: int) -> Session:
+        return WorstFitSession(capacity)
 
 
-class RefinedFirstFit(Online):
+class WorstFitSession(Session):
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity)
+        # max-heap of (unused space, bin index), lowest index first on ties
+        self.spaces = [(-capacity, self.solution.new_bin())]
+
+    def _push(self, w: int) -> int:
+        # the bin with the maximum unused space is on top of the heap
+        max_space, max_index = self.spaces[0]
+        # if the item does not fit there, create new bin
+        if -max_space < w:
+            max_index = self.solution.new_bin()
+            heappush(self.spaces, (w - self.capacity, max_index))
+        # insert the item into the correct bin
+        else:
+            heapreplace(self.spaces, (max_space + w, max_index))
+        self.solution.place(w, max_index)
+        return max_index
 
-    def _process(self, capacity: int, stream: WeightStream) -> Solution:
-        solution = [[[]], [[]], [[]], [[]]]
-        i = 0
-        # Normalize/Categorize the weights
-        for w in stream:
-            size_class = normalize(w, capacity)
-            # add A1 item into Class 1
-            if size_class == 0:
-                solution[0] = RefinedFirstFit._first_fit(
-                    capacity, w, solution[0])
-            # add B1 item into Class 2
-            elif size_class == 1:
-                solution[1] = RefinedFirstFit._first_fit(
-                    capacity, w, solution[1])
-            elif size_class == 2:
-                i += 1
-                if (i % 6 == 0 or i % 7 == 0 or i % 8 == 0 or i % 9 == 0):
-                    solution[0] = RefinedFirstFit._first_fit(
-                        capacity, w, solution[0])
-                # Otherwise, add to class 3
-                else:
-                    solution[2] = RefinedFirstFit._first_fit(
-                        capacity, w, solution[2])
-            # add X item into Class 4
-            else:
-                solution[3] = RefinedFirstFit._first_fit(
-                    capacity, w, solution[3])
-
-        all_solution = solution[0] + solution[1] + solution[2] + solution[3]
-
-        return [sol for sol in all_solution if sol]
-
-    @staticmethod
-    def _first_fit(capacity: int, current_w: int,
-                   bins: list[list[int]]) -> list[list[int]]:
+
+class RefinedFirstFit(Online):
+    '''Bins are listed class by class, then in the order of their class'''
+
+    def _compact(self, capacity: int, stream: Iterator[int]) \
+            -> CompactSolution:
+        session = self.open(capacity)
+        session.feed(stream)
+        return session.by_class()
+
+    def _open(self, capacity: int) -> Session:
+        return RefinedFirstFitSession(capacity)
+
+
+class RefinedFirstFitSession(Session):
+    '''
+        The session numbers the bins in the order they receive their first
+        item, which differs from the order of RefinedFirstFit when an item
+        does not fit the empty first bin of its class: by_class() gives
+        the solution in that order
+    '''
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity)
+        # residual capacity of the bins in each class, and the index in
+        # the solution of the ones holding an item (-1 before that)
+        self.residuals = [ResidualTree() for _ in range(4)]
+        self.bin_ids = [[] for _ in range(4)]
+        for tree in self.residuals:
+            tree.append(capacity)
+        self.b2_count = 0
+
+    def _push(self, w: int) -> int:
+        # Normalize/Categorize the weight
+        size_class = normalize(w, self.capacity)
+        # A1 items go to Class 1, B1 items to Class 2, X items to Class 4
+        if size_class == 2:
+            self.b2_count += 1
+            i = self.b2_count
+            # some B2 items go to Class 1, the others to Class 3
+            if not (i % 6 == 0 or i % 7 == 0 or i % 8 == 0 or i % 9 == 0):
+                return self._first_fit(2, w)
+            size_class = 0
+        return self._first_fit(size_class, w)
+
+    def by_class(self) -> CompactSolution:
+        '''Solution with the bins renumbered class by class'''
+        order = [i for ids in self.bin_ids for i in ids if i != -1]
+        rank = [0] * len(order)
+        for position, i in enumerate(order):
+            rank[i] = position
+        solution = self.solution
+        ordered = CompactSolution()
+        ordered.weights = solution.weights
+        ordered.assignment = array('i', [rank[i]
+                                         for i in solution.assignment])
+        loads = solution.loads
+        ordered.loads = array(loads.typecode, [loads[i] for i in order])
+        return ordered
+
+    def _first_fit(self, size_class: int, w: int) -> int:
         # first fit algorithm specifically for refined fit
-        for i, bin in enumerate(bins):
-            if sum(bin) + current_w < capacity:
-                bin.append(current_w)
-                break
-            # add the item as a new list if every bin fails to hold it
-            if i == len(bins) - 1:
-                bins.append([current_w])
-                break
-        return bins
+        residuals = self.residuals[size_class]
+        bin_ids = self.bin_ids[size_class]
+        local = residuals.first_above(w)
+        # open a new bin of the class if every bin fails to hold it
+        if local == -1:
+            local = residuals.append(self.capacity)
+        if local >= len(bin_ids):
+            bin_ids.extend([-1] * (local + 1 - len(bin_ids)))
+        if bin_ids[local] == -1:
+            bin_ids[local] = self.solution.new_bin()
+        residuals[local] -= w
+        self.solution.place(w, bin_ids[local])
+        return bin_ids[local]
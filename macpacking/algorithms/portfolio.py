@@ -0,0 +1,114 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import Manager
+from multiprocessing.managers import SyncManager
+from threading import Event
+from time import perf_counter
+from typing import Union
+from .. import Solution, WeightSet
+from ..model import BinPacker, Online, Offline
+from ..bounds import lower_bound
+from .offline import NextFit, FirstFit, BestFit, WorstFit
+from .baseline import BenMaier
+from .improved import Improved
+from .exact import BranchAndBound
+import atexit
+
+# Worker processes shared by every portfolio, created on first use
+_executor: ProcessPoolExecutor = None
+# Server of the events that cancel the members still running
+_manager: SyncManager = None
+
+
+def pool() -> ProcessPoolExecutor:
+    '''The process pool shared by the portfolios'''
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor()
+        atexit.register(shutdown)
+    return _executor
+
+
+def cancel_event() -> Event:
+    '''New event that worker processes can see being set'''
+    global _manager
+    if _manager is None:
+        _manager = Manager()
+        atexit.register(shutdown)
+    return _manager.Event()
+
+
+def shutdown() -> None:
+    '''Stop the worker processes, a new pool is created when needed'''
+    global _executor, _manager
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
+
+
+def _solve(algo: BinPacker, capacity: int, weights: list[int],
+           cancel: Event = None) -> Solution:
+    # runs in a worker process, on a copy of algo: the members that can
+    # be interrupted get the portfolio's cancel event
+    if cancel is not None and hasattr(algo, 'cancel'):
+        algo.cancel = cancel
+    if isinstance(algo, Online):
+        solution = algo((capacity, iter(weights)))
+    else:
+        solution = algo((capacity, weights))
+    return [b for b in solution if b]
+
+
+class Portfolio(Offline):
+    '''
+        Runs several strategies concurrently on the shared process pool
+        and returns the solution with the fewest bins, as soon as one
+        meets the lower bound or when the deadline expires. Strategies
+        not started yet are cancelled, and the improvement and exact
+        stages still running are stopped through a shared event, so
+        that they do not hold the workers of the next call. Without any
+        result in time, the FirstFit decreasing solution is returned.
+    '''
+
+    def __init__(self, algos: list[Union[type[BinPacker], BinPacker]] = None,
+                 deadline_ms: float = 1000) -> None:
+        self.deadline_ms = deadline_ms
+        if algos is None:
+            budget = deadline_ms * 0.8
+            algos = [NextFit, FirstFit, BestFit, WorstFit, BenMaier,
+                     Improved(BestFit, budget_ms=budget),
+                     BranchAndBound(time_budget=budget / 1000)]
+        self.algos = [a() if isinstance(a, type) else a for a in algos]
+        self.winner: BinPacker = None
+
+    def _process(self, capacity: int, weights: WeightSet) -> Solution:
+        deadline = perf_counter() + self.deadline_ms / 1000
+        weights = list(weights)
+        bound = lower_bound((capacity, weights))
+        executor = pool()
+        cancel = cancel_event()
+        futures = {executor.submit(_solve, algo, capacity, weights, cancel):
+                   algo for algo in self.algos}
+        best, self.winner = None, None
+        pending = set(futures)
+        while pending:
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                solution = future.result()
+                if best is None or len(solution) < len(best):
+                    best, self.winner = solution, futures[future]
+            if best is not None and len(best) <= bound:
+                break
+        for future in pending:
+            future.cancel()
+        cancel.set()
+        if best is None:
+            self.winner = FirstFit()
+            best = _solve(self.winner, capacity, weights)
+        return best
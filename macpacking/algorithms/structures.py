@@ -0,0 +1,146 @@
+from bisect import bisect_left, insort
+from heapq import heapify, heappop, heappush
+
+
+class ResidualTree():
+    '''
+        Tournament (max segment) tree over the residual capacity of bins.
+        Leaves are the residuals in bin order, internal nodes hold the
+        maximum of their children, so the leftmost bin whose residual is
+        above a given value is found in O(log bins).
+    '''
+
+    def __init__(self) -> None:
+        self.__size = 1                      # number of leaves available
+        self.__count = 0                     # number of bins stored
+        self.__tree = [float('-inf')] * 2
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __getitem__(self, index: int) -> int:
+        return self.__tree[self.__size + index]
+
+    def append(self, residual: int) -> int:
+        '''Add a new bin at the end, return its index'''
+        if self.__count == self.__size:
+            self._grow()
+        index = self.__count
+        self.__count += 1
+        self[index] = residual
+        return index
+
+    def extend(self, residual: int, times: int) -> None:
+        '''Add times new bins sharing the same residual at the end'''
+        if times <= 0:
+            return
+        start = self.__count
+        self.__count += times
+        while self.__count > self.__size:
+            self._grow()
+        tree = self.__tree
+        low = self.__size + start
+        high = self.__size + self.__count
+        tree[low:high] = [residual] * times
+        # recompute the maximum of every ancestor of the new leaves
+        low >>= 1
+        high = (high - 1) >> 1
+        while low:
+            tree[low:high + 1] = map(max, tree[2 * low:2 * high + 2:2],
+                                     tree[2 * low + 1:2 * high + 2:2])
+            low >>= 1
+            high >>= 1
+
+    def __setitem__(self, index: int, residual: int) -> None:
+        tree = self.__tree
+        node = self.__size + index
+        tree[node] = residual
+        node >>= 1
+        # propagate the new maximum towards the root
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            best = left if left > right else right
+            if tree[node] == best:
+                break
+            tree[node] = best
+            node >>= 1
+
+    def first_above(self, value: int) -> int:
+        '''
+            Index of the leftmost bin whose residual is strictly greater
+            than value, or -1 if there is no such bin
+        '''
+        tree = self.__tree
+        if tree[1] <= value:
+            return -1
+        node = 1
+        while node < self.__size:
+            node *= 2
+            if tree[node] <= value:
+                node += 1
+        return node - self.__size
+
+    def _grow(self) -> None:
+        # Double the number of leaves and rebuild the internal nodes
+        leaves = self.__tree[self.__size:]
+        self.__size *= 2
+        tree = [float('-inf')] * self.__size + leaves +\
+            [float('-inf')] * (self.__size - len(leaves))
+        for node in range(self.__size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self.__tree = tree
+
+
+class ResidualIndex():
+    '''
+        Ordered index of bins keyed by residual capacity. Bins sharing the
+        same residual are grouped in a bucket, and the distinct residuals
+        are kept sorted, so the tightest bin able to hold an item is found
+        with a binary search instead of a scan over all bins.
+    '''
+
+    def __init__(self) -> None:
+        self.__keys: list[int] = []                # sorted distinct residuals
+        self.__buckets: dict[int, list[int]] = {}  # residual -> -bin index
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.__buckets.values())
+
+    def add(self, index: int, residual: int) -> None:
+        '''Register a bin with its residual capacity'''
+        bucket = self.__buckets.get(residual)
+        if bucket is None:
+            bucket = self.__buckets[residual] = []
+            insort(self.__keys, residual)
+        heappush(bucket, -index)
+
+    def add_range(self, start: int, stop: int, residual: int) -> None:
+        '''Register the bins start..stop-1, all with the same residual'''
+        if start >= stop:
+            return
+        bucket = self.__buckets.get(residual)
+        if bucket is None:
+            # decreasing indices already satisfy the heap invariant
+            self.__buckets[residual] = list(range(-stop + 1, -start + 1))
+            insort(self.__keys, residual)
+        else:
+            bucket.extend(range(-stop + 1, -start + 1))
+            heapify(bucket)
+
+    def pop_best(self, value: int) -> tuple[int, int]:
+        '''
+            Remove and return (index, residual) of the bin with the smallest
+            residual that is at least value, preferring the highest index on
+            ties, or (-1, None) if no bin can hold value
+        '''
+        keys = self.__keys
+        position = bisect_left(keys, value)
+        if position == len(keys):
+            return -1, None
+        residual = keys[position]
+        bucket = self.__buckets[residual]
+        index = -heappop(bucket)
+        if not bucket:
+            del self.__buckets[residual]
+            del keys[position]
+        return index, residual
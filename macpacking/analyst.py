@@ -1,12 +1,17 @@
 from macpacking.model import BinPacker, Offline, Online
-from macpacking.reader import OracleReader
-from utils.algo_runner import run_in_folder
+from macpacking.reader import OracleRegistry, oracles
+from macpacking.catalog import catalog, Entry
+from macpacking.bounds import lower_bound
+from macpacking.results import ResultTable
+from macpacking.solution import bin_loads
+from macpacking.algorithms.exact import BranchAndBound
+from utils.algo_runner import run_all
 from utils.dict_util import find_child_keys
+from utils.result_cache import ResultCache
 from utils.plot_util import set_attributes
 from utils.algo_util import get_algo_name
 import matplotlib.pyplot as plt
 import os
-import re
 import json
 
 
@@ -16,11 +21,16 @@ class Analyst:
                  on_algos: list[Online], datasets: list[str],
                  out1: str = 'discrete_out.json',
                  out2: str = 'continuous_out.json',
-                 out3: str = 'normalized_out.json') -> None:
+                 out3: str = 'normalized_out.json',
+                 out4: str = 'results.npz',
+                 solver_budget: float = 2.0,
+                 cache: ResultCache = None) -> None:
         self.datasets = datasets
-        self.oracle_readers = []
-        for dataset in datasets:
-            self.oracle_readers.append(OracleReader(dataset))
+        # results already computed, only the missing ones are run
+        self.cache = cache
+        # time budget of the exact solver, in seconds, for the instances
+        # without an oracle entry
+        self.solver_budget = solver_budget
 
         self.off_algos = off_algos
         self.on_algos = on_algos
@@ -28,6 +38,7 @@ class Analyst:
         self.out1 = out1
         self.out2 = out2
         self.out3 = out3
+        self.out4 = out4
 
         # Create data structure to store discrete and continuous results
         # e.g., {<NextFit object>: ['N1C1W1_A': 3, 'N1C1W1_B': 4]}
@@ -37,8 +48,13 @@ class Analyst:
             get_algo_name(algo): {} for algo in on_algos + off_algos}
         self.normalize_continuous: dict[BinPacker: dict[str: int]] = {
             get_algo_name(algo): {} for algo in on_algos + off_algos}
+        # Same results as a table, one row per (algorithm, instance)
+        self.rows = []
+        self.table: ResultTable = None
+        self.__bounds: dict[str, int] = {}
+        self.__optima: dict[str, int] = {}
 
-    def obtain_results(self) -> None:
+    def obtain_results(self, workers: int = 1) -> None:
         # Add binpp datasets separately
         # since it is structured a bit differently
         all_path = []
@@ -48,66 +64,86 @@ class Analyst:
         for dataset in self.datasets:
             if dataset != 'binpp':
                 all_path.append(dataset)
-        # Conduct tests on all datasets
+        # Conduct tests on all datasets, in the same order with or
+        # without worker processes
+        algos = self.on_algos + self.off_algos
+        # [0] * 100 as a place holder
+        jobs = [(algo, path, [0]*100) for path in all_path for algo in algos]
+        runtimes = [{} for _ in jobs]
+        results = run_all(jobs, workers, self.cache, runtimes)
+        self.rows = []
         for i, path in enumerate(all_path):
-            for algo in self.on_algos:
-                # [0] * 100 as a place holder
-                on_result = run_in_folder(algo, path, [0]*100)
-                self.check_result(on_result, algo)
-            for algo in self.off_algos:
-                off_result = run_in_folder(algo, path, [0]*100)
-                self.check_result(off_result, algo)
+            for j, algo in enumerate(algos):
+                k = i * len(algos) + j
+                self.check_result(results[k], algo, runtimes[k])
             if (i % 3 == 0):
                 print(".", end="")
+        self.table = ResultTable.build(self.rows)
 
     def obtain_op_results(self) -> dict[dict[str: int]]:
         # Extract optimal results from the oracle files
-        self.op_results = {}
-        for i, reader in enumerate(self.oracle_readers):
-            self.op_results[self.datasets[i]] = reader.read_file()
+        self.op_results = {dataset: oracles().dataset(dataset)
+                           for dataset in self.datasets}
 
     def check_result(self, result: dict[str: list[list[int]]],
-                     algo: BinPacker) -> None:
+                     algo: BinPacker,
+                     runtimes: dict[str: float] = None) -> None:
         # Check result of an algorithm against the optimal solution
         algo = get_algo_name(algo)
+        index = catalog()
         for file, sol in result.items():
-            # Check results for binpp dataset
-            if re.search(r'N\d{1}C\d{1}W\d{1}', file) is not None:
-                op_sol = self.op_results['binpp'][file]
-                self.discrete[algo][file] = op_sol == len(sol)
-                self.continuous[algo][file] = len(sol) - op_sol
-                self.normalize_continuous[algo][file] =\
-                    (len(sol) - op_sol) / op_sol
-            # Check results for binpp-hard dataset
-            elif re.search('HARD', file) is not None:
-                op_sol = self.op_results['binpp-hard'][file]
-                self.discrete[algo][file] = op_sol == len(sol)
-                self.continuous[algo][file] = len(sol) - op_sol
-                self.normalize_continuous[algo][file] =\
-                    (len(sol) - op_sol) / op_sol
-            # Check results for jburkardt dataset
-            elif re.search(r'p-\d{2}', file) is not None:
-                file = file.replace('-', '_')
-                op_sol = self.op_results['jburkardt'][file]
-                self.discrete[algo][file] = (
-                    op_sol == len(sol))
-                self.continuous[algo][file] = len(sol) - op_sol
-                self.normalize_continuous[algo][file] =\
-                    (len(sol) - op_sol) / op_sol
+            entry = index.get(file)
+            if entry is None:
+                continue
+            file = entry.name
+            op_sol = self._optimum(entry)
+            self.discrete[algo][file] = op_sol == len(sol)
+            self.continuous[algo][file] = len(sol) - op_sol
+            self.normalize_continuous[algo][file] =\
+                (len(sol) - op_sol) / op_sol
+            runtime = (runtimes or {}).get(entry.key)
+            self.rows.append((algo, entry, len(sol), op_sol,
+                              self._bound(entry), runtime, bin_loads(sol)))
+
+    def _bound(self, entry: Entry) -> int:
+        # lower bound of an instance, computed once
+        if entry.name not in self.__bounds:
+            self.__bounds[entry.name] = lower_bound(entry.open().offline())
+        return self.__bounds[entry.name]
+
+    def _optimum(self, entry: Entry) -> int:
+        '''
+            Optimal number of bins from the oracle. Without an oracle entry,
+            the exact solver is run on the instance, once; when it cannot
+            prove its solution within the budget, the lower bound is used
+        '''
+        op_results = self.op_results.get(entry.dataset, {})
+        file = OracleRegistry.normalize(entry.name)
+        if file in op_results:
+            return op_results[file]
+        if entry.name not in self.__optima:
+            solver = BranchAndBound(self.solver_budget)
+            solution = solver(entry.open().offline())
+            self.__optima[entry.name] = \
+                len(solution) if solver.proven else solver.bound
+        return self.__optima[entry.name]
 
     @staticmethod
     def gen_binpp_path() -> list[str]:
         '''
             Get all file paths in of binpp dataset
         '''
-        all_folder = os.listdir('_datasets/binpp')
-        all_folder.remove('_source.txt')
-        return [f'binpp/{folder}' for folder in all_folder]
+        return catalog().folders('binpp')
 
-    def write_result(self):
+    def write_result(self, export_json: bool = False):
         '''
-            Write the result to a .json file
+            Write the table to a .npz file, and optionally the result
+            dicts to .json files
         '''
+        if self.table is not None:
+            self.table.save(f'outputs/{self.out4}')
+        if not export_json:
+            return
         with open(f'outputs/{self.out1}', 'w') as f:
             data = json.dumps(self.discrete)
             f.write(data)
@@ -122,19 +158,26 @@ class Analyst:
         '''
             Plot the results
         '''
-        # Obtain the resutls if the output files doesn't exist
+        # Read the table, or the .json files (committed, unlike the
+        # table); obtain the results if neither exists
         f1 = f'outputs/{self.out1}'
         f2 = f'outputs/{self.out2}'
         f3 = f'outputs/{self.out3}'
-        if (not os.path.exists(f1) or not os.path.exists(f2)
-                or not os.path.exists(f3)):
+        f4 = f'outputs/{self.out4}'
+        exported = all(os.path.exists(f) for f in [f1, f2, f3])
+        # With a result cache, only the missing results are computed
+        if self.cache is not None or \
+                not (os.path.exists(f4) or exported):
             self.obtain_results()
             self.write_result()
 
         ''' Example format for c_result:
         {'Online NextFit': {'N1C1W1_A': 1, 'N1C1W1_B': 1},
         'Online FirstFit': {'N1C1W1_A': 2, 'N1C1W1_B': 1}}'''
-        _, _, c_result = Analyst.read_result(f1, f2, f3)
+        if os.path.exists(f4):
+            _, _, c_result = Analyst.read_result(f4)
+        else:
+            _, _, c_result = Analyst.read_json(f1, f2, f3)
 
         # Get ticks for the graph
         tick = self._find_tick(find_child_keys(c_result))
@@ -179,10 +222,8 @@ class Analyst:
     def _check_binpp(self, key: str):
         if 'binpp' not in self.datasets:
             return ""
-        binpp = os.listdir('_datasets/binpp')
-        binpp.remove('_source.txt')
         name = key.split('_')[0]
-        if name in binpp and 'A' in key:
+        if catalog().family(name) and 'A' in key:
             return name
         else:
             return ""
@@ -205,13 +246,30 @@ class Analyst:
         else:
             return ""
 
-    # Static method to read result file
+    # Static method to read the discrete, continuous and normalized
+    # results from a table file
     @staticmethod
-    def read_result(f1: str,
-                    f2: str,
-                    f3: str) -> tuple[dict[BinPacker: dict[str, int]],
-                                      dict[BinPacker: dict[str, bool]],
+    def read_result(f4: str) -> tuple[dict[BinPacker: dict[str, bool]],
+                                      dict[BinPacker: dict[str, int]],
                                       dict[BinPacker: dict[str, float]]]:
+        table = ResultTable.load(f4)
+        result = ({}, {}, {})
+        # algorithms in the order they were run
+        for algo in dict.fromkeys(table['algo'].tolist()):
+            rows = table.where(algo=algo)
+            instances = rows['instance'].tolist()
+            for values, metric in zip(result, [rows.optimal(), rows.gap(),
+                                               rows.normalized_gap()]):
+                values[algo] = dict(zip(instances, metric.tolist()))
+        return result
+
+    # Static method to read the result files exported as .json
+    @staticmethod
+    def read_json(f1: str,
+                  f2: str,
+                  f3: str) -> tuple[dict[BinPacker: dict[str, bool]],
+                                    dict[BinPacker: dict[str, int]],
+                                    dict[BinPacker: dict[str, float]]]:
         result = []
         with open(f1, 'r') as f:
             result.append(json.load(f))
@@ -0,0 +1,176 @@
+from os import listdir, path
+from .reader import BinppReader
+from .solution import CompactSolution
+from . import WeightSet
+import numpy as np
+
+
+class Batch():
+    '''
+        A family of instances packed in a padded 2-D weight matrix: one row
+        per instance, padded with zeros up to the largest instance, with
+        the capacity and the number of items of every row
+    '''
+
+    def __init__(self, names: list[str], capacities: np.ndarray,
+                 weights: np.ndarray, sizes: np.ndarray) -> None:
+        self.names = names
+        self.capacities = capacities
+        self.weights = weights
+        self.sizes = sizes
+
+    @staticmethod
+    def from_sets(names: list[str], sets: list[WeightSet]) -> 'Batch':
+        '''Build a batch from a list of WeightSets'''
+        sizes = np.array([len(weights) for _, weights in sets], dtype=np.int64)
+        matrix = np.zeros((len(sets), sizes.max(initial=0)), dtype=np.int64)
+        for row, (_, weights) in enumerate(sets):
+            matrix[row, :len(weights)] = weights
+        capacities = np.array([c for c, _ in sets], dtype=np.int64)
+        return Batch(names, capacities, matrix, sizes)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def decreasing(self) -> 'Batch':
+        '''Same batch with the weights of every row in decreasing order'''
+        # padding zeros are the smallest values, so they stay at the end
+        weights = -np.sort(-self.weights, axis=1)
+        return Batch(self.names, self.capacities, weights, self.sizes)
+
+
+class BatchResult():
+    '''
+        Outcome of a batched run: the number of bins of every instance,
+        the bin of every item (-1 on padding) and the load of every bin
+    '''
+
+    def __init__(self, batch: Batch, counts: np.ndarray,
+                 assignment: np.ndarray, loads: np.ndarray) -> None:
+        self.batch = batch
+        self.counts = counts
+        self.assignment = assignment
+        self.loads = loads
+
+    def bins(self) -> dict[str: int]:
+        '''Number of bins used for every instance'''
+        return dict(zip(self.batch.names, self.counts.tolist()))
+
+    def solution(self, row: int) -> CompactSolution:
+        '''Compact solution of a single instance'''
+        size = self.batch.sizes[row]
+        solution = CompactSolution()
+        solution.weights.frombytes(
+            self.batch.weights[row, :size].astype(np.int32).tobytes())
+        solution.assignment.frombytes(
+            self.assignment[row, :size].astype(np.int32).tobytes())
+        solution.loads.frombytes(
+            self.loads[row, :self.counts[row]].astype(np.int64).tobytes())
+        return solution
+
+
+def load_family(folder: str) -> Batch:
+    '''
+        Load every instance of a BinPP folder (e.g., _datasets/binpp/N4C2W2)
+        in the order their readers would give them to an algorithm
+    '''
+    return load_families([folder])
+
+
+def load_families(folders: list[str] = None,
+                  root: str = '_datasets/binpp') -> Batch:
+    '''
+        Stack the instances of several BinPP folders in one batch, every
+        folder of root by default: the engines only pay off over many rows
+    '''
+    if folders is None:
+        folders = sorted(path.join(root, f) for f in listdir(root)
+                         if path.isdir(path.join(root, f)))
+    names, sets = [], []
+    for folder in folders:
+        files = sorted(f for f in listdir(folder) if f.endswith('.BPP.txt'))
+        names += [f.split('.')[0] for f in files]
+        sets += [BinppReader(path.join(folder, f)).offline() for f in files]
+    return Batch.from_sets(names, sets)
+
+
+def next_fit(batch: Batch) -> BatchResult:
+    '''NextFit over every row at once, same bins as online NextFit'''
+    rows = np.arange(len(batch))
+    counts = np.ones(len(batch), dtype=np.int64)
+    remaining = batch.capacities.copy()
+    assignment = np.full(batch.weights.shape, -1, dtype=np.int64)
+    loads = np.zeros((len(batch), batch.weights.shape[1] + 1),
+                     dtype=np.int64)
+    for j in range(batch.weights.shape[1]):
+        w = batch.weights[:, j]
+        active = j < batch.sizes
+        fits = remaining >= w
+        # a new bin is opened when the item does not fit the current one
+        counts += active & ~fits
+        remaining = np.where(active,
+                             np.where(fits, remaining, batch.capacities) - w,
+                             remaining)
+        assignment[active, j] = counts[active] - 1
+        loads[rows[active], counts[active] - 1] += w[active]
+    return BatchResult(batch, counts, assignment, loads)
+
+
+def first_fit(batch: Batch) -> BatchResult:
+    '''FirstFit over every row at once, same bins as online FirstFit'''
+    def choose(residuals, w):
+        # leftmost bin with load + w < capacity
+        feasible = residuals > w[:, None]
+        return feasible.any(axis=1), feasible.argmax(axis=1)
+    return _any_fit(batch, choose)
+
+
+def best_fit(batch: Batch) -> BatchResult:
+    '''BestFit over every row at once, same bins as online BestFit'''
+    def choose(residuals, w):
+        # tightest bin that holds the item, highest index on ties
+        feasible = residuals >= w[:, None]
+        keyed = np.where(feasible, residuals, np.iinfo(np.int64).max)
+        last = keyed.shape[1] - 1
+        return feasible.any(axis=1), last - keyed[:, ::-1].argmin(axis=1)
+    return _any_fit(batch, choose)
+
+
+def worst_fit(batch: Batch) -> BatchResult:
+    '''WorstFit over every row at once, same bins as online WorstFit'''
+    def choose(residuals, w):
+        # emptiest bin, lowest index on ties
+        best = residuals.argmax(axis=1)
+        fits = residuals[np.arange(len(w)), best] >= w
+        return fits, best
+    return _any_fit(batch, choose)
+
+
+def _any_fit(batch: Batch, choose) -> BatchResult:
+    # Shared loop of the fit heuristics: bins that are not opened yet get
+    # the smallest residual so that they are never chosen
+    closed = np.iinfo(np.int64).min // 2
+    rows = np.arange(len(batch))
+    counts = np.ones(len(batch), dtype=np.int64)
+    residuals = np.full((len(batch), batch.weights.shape[1] + 1), closed,
+                        dtype=np.int64)
+    residuals[:, 0] = batch.capacities
+    assignment = np.full(batch.weights.shape, -1, dtype=np.int64)
+    for j in range(batch.weights.shape[1]):
+        active = j < batch.sizes
+        if not active.any():
+            break
+        w = batch.weights[active, j]
+        limit = counts.max()
+        fits, index = choose(residuals[active, :limit], w)
+        opened = counts[active]
+        index = np.where(fits, index, opened)
+        # open the new bins before placing the items
+        new = rows[active][~fits]
+        residuals[new, opened[~fits]] = batch.capacities[new]
+        counts[new] += 1
+        residuals[rows[active], index] -= w
+        assignment[active, j] = index
+    loads = batch.capacities[:, None] - residuals
+    loads[residuals == closed] = 0
+    return BatchResult(batch, counts, assignment, loads)
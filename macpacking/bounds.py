@@ -0,0 +1,123 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import accumulate
+from . import WeightSet
+
+# Number of dual feasible functions tried by the L3 bound
+DFF_ROUNDS = 10
+
+
+def l1(capacity: int, weights: list[int]) -> int:
+    '''Continuous lower bound: ceil(sum of the weights / capacity)'''
+    return -(-sum(weights) // capacity)
+
+
+def l2(capacity: int, weights: list[int]) -> int:
+    '''
+        Martello-Toth lower bound. For every threshold K <= C/2, items
+        larger than C-K need a bin each, items in (C/2, C-K] need a bin
+        each as well, and items in [K, C/2] must fit in the space those
+        bins leave or in extra bins
+    '''
+    items = sorted(weights)
+    prefix = [0] + list(accumulate(items))
+    total = len(items)
+
+    def above(x: float) -> int:
+        # index of the first item strictly greater than x
+        return bisect_right(items, x)
+
+    half = above(capacity / 2)
+    best = l1(capacity, items) if items else 0
+    thresholds = set(items[:half]) | {0}
+    for k in thresholds:
+        big = above(capacity - k)
+        n1 = total - big                        # w > C - K
+        n2 = big - half                         # C/2 < w <= C - K
+        s2 = prefix[big] - prefix[half]
+        small = bisect_left(items, k)
+        s3 = prefix[half] - prefix[small]       # K <= w <= C/2
+        extra = max(0, -(-(s3 - (n2 * capacity - s2)) // capacity))
+        best = max(best, n1 + n2 + extra)
+    return int(best)
+
+
+def reduce(capacity: int,
+           weights: list[int]) -> tuple[list[list[int]], list[int]]:
+    '''
+        Martello-Toth reduction: going from the largest item down, an item
+        is given a bin of its own, together with the largest item fitting
+        with it, whenever that bin dominates every other feasible bin of
+        the item (nothing fits, the bin is full, no two items fit with it,
+        or no pair fitting with it is heavier). Return the bins fixed this
+        way and the items left, by decreasing weight.
+    '''
+    free = sorted(weights)
+    fixed = []
+    position = len(free) - 1
+    while position >= 0:
+        w = free.pop(position)
+        room = capacity - w
+        fitting = bisect_right(free, room)  # free[:fitting] fit with w
+        partner = None
+        if fitting == 0:
+            partner = -1
+        elif w + free[fitting - 1] == capacity or fitting == 1 or \
+                free[0] + free[1] > room:
+            partner = fitting - 1
+        elif fitting < 3 or free[0] + free[1] + free[2] > room:
+            # only singles and pairs fit: the largest single must weigh
+            # at least as much as the heaviest feasible pair
+            pair, low, high = 0, 0, fitting - 1
+            while low < high:
+                if free[low] + free[high] <= room:
+                    pair = max(pair, free[low] + free[high])
+                    low += 1
+                else:
+                    high -= 1
+            if free[fitting - 1] >= pair:
+                partner = fitting - 1
+        if partner is None:
+            free.insert(position, w)
+            position -= 1
+            continue
+        if partner >= 0:
+            fixed.append([w, free.pop(partner)])
+        else:
+            fixed.append([w])
+        position -= 2 if 0 <= partner < position else 1
+    return fixed, free[::-1]
+
+
+def l3(capacity: int, weights: list[int]) -> int:
+    '''
+        Max of L2, of L2 after the Martello-Toth reduction (plus the bins
+        it fixed) and of the bounds given by the Fekete-Schepers dual
+        feasible functions u_k, k = 1..DFF_ROUNDS: with sizes relative to
+        the capacity, u_k(x) = x when (k+1)x is integer, floor((k+1)x)/k
+        otherwise, and ceil(sum of u_k over the items) is still a bound
+    '''
+    best = l2(capacity, weights)
+    fixed, rest = reduce(capacity, weights)
+    best = max(best, len(fixed) + l2(capacity, rest))
+    histogram = Counter(weights)
+    for k in range(1, DFF_ROUNDS + 1):
+        scaled = 0    # sum of k * C * u_k(w / C)
+        for w, count in histogram.items():
+            if (w * (k + 1)) % capacity:
+                scaled += (w * (k + 1) // capacity) * capacity * count
+            else:
+                scaled += k * w * count
+        best = max(best, -(-scaled // (k * capacity)))
+    return int(best)
+
+
+def lower_bound(ws: WeightSet) -> int:
+    '''Best lower bound available on the number of bins'''
+    capacity, weights = ws
+    return l3(capacity, list(weights))
+
+
+def is_optimal(ws: WeightSet, bins: int) -> bool:
+    '''True when a solution with the given number of bins is optimal'''
+    return bins <= lower_bound(ws)
@@ -0,0 +1,87 @@
+from array import array
+from hashlib import sha1
+from mmap import mmap, ACCESS_READ
+from typing import Callable
+import os
+import struct
+
+# Header of a cached instance: magic, capacity, number of items, and a
+# stamp of the source files (their paths, mtimes and sizes). The int32
+# weights follow the header.
+HEADER = struct.Struct('<4sqq20s')
+MAGIC = b'MPK1'
+INT32 = (-2**31, 2**31 - 1)
+
+
+class InstanceCache():
+    '''
+        Binary cache of parsed instances. An instance read for the first
+        time is parsed from its text files and stored in the folder; later
+        reads memory-map the stored file and view its weights without
+        copying them. Entries are rebuilt when the mtime or the size of a
+        source file changes.
+    '''
+
+    def __init__(self, folder: str = '_cache/instances') -> None:
+        self.folder = folder
+
+    def load(self, sources: list[str],
+             parse: Callable[[], tuple[int, list[int]]]
+             ) -> tuple[int, memoryview]:
+        '''Capacity and weights of an instance, parsing it if needed'''
+        stamp = self._stamp(sources)
+        filename = self._filename(sources)
+        cached = self._map(filename, stamp)
+        if cached is not None:
+            return cached
+        capacity, weights = parse()
+        if weights and (min(weights) < INT32[0] or max(weights) > INT32[1]):
+            # too large for the binary format, not cached
+            return capacity, memoryview(array('q', weights))
+        self._write(filename, stamp, capacity, weights)
+        return capacity, memoryview(array('i', weights))
+
+    def _map(self, filename: str, stamp: bytes) -> tuple[int, memoryview]:
+        try:
+            with open(filename, 'rb') as f:
+                mapped = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(mapped) < HEADER.size:
+            return None
+        magic, capacity, n, source = HEADER.unpack_from(mapped)
+        if magic != MAGIC or source != stamp or \
+                len(mapped) != HEADER.size + 4 * n:
+            return None
+        return capacity, memoryview(mapped)[HEADER.size:].cast('i')
+
+    def _write(self, filename: str, stamp: bytes,
+               capacity: int, weights: list[int]) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        # written aside then renamed, readers never see a partial file
+        temporary = f'{filename}.{os.getpid()}'
+        with open(temporary, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, capacity, len(weights), stamp))
+            array('i', weights).tofile(f)
+        os.replace(temporary, filename)
+
+    def _filename(self, sources: list[str]) -> str:
+        key = '\n'.join(os.path.abspath(s) for s in sources)
+        return os.path.join(self.folder,
+                            sha1(key.encode()).hexdigest() + '.bin')
+
+    @staticmethod
+    def _stamp(sources: list[str]) -> bytes:
+        digest = sha1()
+        for source in sources:
+            status = os.stat(source)
+            digest.update(
+                f'{source}:{status.st_mtime_ns}:{status.st_size}\n'.encode())
+        return digest.digest()
+
+    def clear(self) -> None:
+        '''Remove every cached instance'''
+        if os.path.isdir(self.folder):
+            for name in os.listdir(self.folder):
+                if name.endswith('.bin'):
+                    os.remove(os.path.join(self.folder, name))
@@ -0,0 +1,212 @@
+from typing import NamedTuple
+from .reader import (DatasetReader, BinppReader, JburkardtReader,
+                     OracleRegistry)
+import json
+import os
+import re
+
+# File the catalog is persisted to, in the datasets folder
+CATALOG_FILE = '_catalog.json'
+DATASETS = ['binpp', 'binpp-hard', 'jburkardt']
+
+
+class Entry(NamedTuple):
+    '''An instance of the datasets'''
+    name: str               # name in the oracle files, e.g. p_01
+    key: str                # key of the runner results, e.g. p-01
+    dataset: str            # binpp, binpp-hard or jburkardt
+    family: str             # e.g. N1C1W1, HARD or jburkardt
+    folder: str             # folder given to run_in_folder
+    params: dict[str, int]  # N, C and W of the binpp instances
+    n: int
+    capacity: int
+    path: str               # path given to the reader
+    files: list[str]
+    reader: str
+    optimum: int            # None without an oracle entry
+
+    def open(self) -> DatasetReader:
+        '''Reader of the instance'''
+        readers = {'BinppReader': BinppReader,
+                   'JburkardtReader': JburkardtReader}
+        return readers[self.reader](self.path)
+
+
+class Catalog():
+    '''
+        Index of the instances of the datasets, built by scanning the
+        folders once and persisted next to them. Entries keep the order
+        the folders were listed in, and lookups by name, folder, dataset,
+        family or N/C/W parameter are dictionary accesses.
+    '''
+
+    def __init__(self, entries: list[Entry]) -> None:
+        self.entries = entries
+        self.__names: dict[str, Entry] = {}
+        self.__groups: dict[tuple[str, object], list[Entry]] = {}
+        for entry in entries:
+            self.__names[entry.name] = entry
+            self.__names[entry.key] = entry
+            groups = [('folder', entry.folder), ('dataset', entry.dataset),
+                      ('family', entry.family)]
+            groups += [(p, v) for p, v in (entry.params or {}).items()]
+            for group in groups:
+                self.__groups.setdefault(group, []).append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str) -> Entry:
+        '''Entry of an instance, by oracle name or result key'''
+        return self.__names.get(name)
+
+    def folder(self, folder: str) -> list[Entry]:
+        return self.__groups.get(('folder', folder), [])
+
+    def dataset(self, dataset: str) -> list[Entry]:
+        return self.__groups.get(('dataset', dataset), [])
+
+    def family(self, family: str) -> list[Entry]:
+        return self.__groups.get(('family', family), [])
+
+    def where(self, **params: int) -> list[Entry]:
+        '''Entries with the given parameters, e.g. where(N=1, C=2)'''
+        selected = None
+        for group in params.items():
+            entries = self.__groups.get(group, [])
+            if selected is None:
+                selected = entries
+            else:
+                kept = set(map(id, entries))
+                selected = [e for e in selected if id(e) in kept]
+        return list(selected) if selected is not None else []
+
+    def folders(self, dataset: str) -> list[str]:
+        '''Folders of a dataset, in catalog order'''
+        return list(dict.fromkeys(e.folder for e in self.dataset(dataset)))
+
+    @staticmethod
+    def build(root: str = '_datasets') -> 'Catalog':
+        '''Scan the dataset folders'''
+        entries = []
+        registry = OracleRegistry(root)
+        for dataset in DATASETS:
+            if not os.path.isdir(f'{root}/{dataset}'):
+                continue
+            optimum = registry.dataset(dataset)
+            for instance in _scan(root, dataset):
+                entries.append(_entry(dataset, *instance,
+                                      optimum.get(instance[3])))
+        return Catalog(entries)
+
+    @staticmethod
+    def scan(folder: str, root: str = '_datasets') -> list[Entry]:
+        '''
+            Entries of a folder the catalog does not index, e.g. a copy of
+            some instances, without oracle values. Its files are read as
+            jburkardt instances when the folder name says so, as binpp
+            ones otherwise.
+        '''
+        path = f'{root}/{folder}'
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f'No dataset folder {path}')
+        dataset = 'jburkardt' if 'jburkardt' in folder else 'binpp'
+        return [_entry(dataset, folder, *instance[1:], None)
+                for instance in _list(path, dataset, folder)]
+
+    @staticmethod
+    def load(root: str = '_datasets') -> 'Catalog':
+        '''
+            Persisted catalog, rebuilt (and saved again) when a dataset
+            folder, instance or oracle file changed since it was saved
+        '''
+        filename = f'{root}/{CATALOG_FILE}'
+        stamp = _stamp(root)
+        if os.path.exists(filename):
+            with open(filename) as f:
+                content = json.load(f)
+            if content['stamp'] == stamp:
+                return Catalog([Entry(*e) for e in content['entries']])
+        catalog = Catalog.build(root)
+        with open(filename, 'w') as f:
+            json.dump({'stamp': stamp,
+                       'entries': [list(e) for e in catalog.entries]}, f)
+        return catalog
+
+
+# Catalog of the default datasets folder, loaded on first use
+_catalog: Catalog = None
+
+
+def catalog() -> Catalog:
+    '''The catalog of the _datasets folder'''
+    global _catalog
+    if _catalog is None:
+        _catalog = Catalog.load()
+    return _catalog
+
+
+def _scan(root: str, dataset: str) -> list[tuple]:
+    # (folder, reader path, files, oracle name, result key) per instance
+    if dataset == 'binpp':
+        instances = []
+        for family in os.listdir(f'{root}/binpp'):
+            if not family.startswith('_'):
+                instances += _list(f'{root}/binpp/{family}', dataset,
+                                   f'binpp/{family}')
+        return instances
+    return _list(f'{root}/{dataset}', dataset, dataset)
+
+
+def _list(path: str, dataset: str, folder: str) -> list[tuple]:
+    # instances of one folder: a file each, or a pair of jburkardt files
+    instances = []
+    for f in os.listdir(path):
+        if f.startswith('_') or os.path.isdir(f'{path}/{f}'):
+            continue
+        if dataset != 'jburkardt':
+            name = f.split('.')[0]
+            instances.append((folder, f'{path}/{f}', [f'{path}/{f}'],
+                              name, name))
+        elif f.endswith('_c.txt'):
+            subs = f.split('_')[0]     # e.g. p01
+            prefix = f'{path}/{subs}_'
+            instances.append((folder, prefix,
+                              [prefix + 'c.txt', prefix + 'w.txt'],
+                              f'{subs[0]}_{subs[1:]}',
+                              f'{subs[0]}-{subs[1:]}'))
+    return instances
+
+
+def _entry(dataset: str, folder: str, path: str, files: list[str],
+           name: str, key: str, optimum: int) -> Entry:
+    # read the instance header for its size and capacity
+    match = re.match(r'N(\d)C(\d)W(\d)', name)
+    if match is not None:
+        params = dict(zip('NCW', map(int, match.groups())))
+        family = match.group(0)
+    else:
+        params = None
+        family = 'HARD' if dataset == 'binpp-hard' else dataset
+    reader = BinppReader(path) if 'binpp' in dataset \
+        else JburkardtReader(path)
+    capacity, weights = reader.mapped()
+    return Entry(name, key, dataset, family, folder, params, len(weights),
+                 capacity, path, files, type(reader).__name__, optimum)
+
+
+def _stamp(root: str) -> dict[str, list[int]]:
+    # modification time and size of the dataset folders, of every file
+    # in them (editing an instance in place leaves its folder unchanged)
+    # and of the oracle files
+    stamp = {}
+    for dataset in DATASETS:
+        paths = [f'{root}/{dataset}_oracle.csv']
+        for folder, _, files in os.walk(f'{root}/{dataset}'):
+            paths.append(folder)
+            paths += [f'{folder}/{f}' for f in files]
+        for path in paths:
+            if os.path.exists(path):
+                info = os.stat(path)
+                stamp[path] = [info.st_mtime_ns, info.st_size]
+    return stamp
@@ -0,0 +1,134 @@
+from typing import Callable, Iterator
+from . import WeightSet, WeightStream
+import numpy as np
+
+# A distribution draws a given number of weights with a generator
+Distribution = Callable[[np.random.Generator, int], np.ndarray]
+
+# An instance class: the capacity and the distribution of the weights
+Spec = tuple[int, Distribution]
+
+# Weights are drawn by chunks of this size (a multiple of 3, for triplets)
+CHUNK = 3 << 15
+
+# BinPP parameters: number of items, capacity and smallest weight
+BINPP_SIZES = {1: 50, 2: 100, 3: 200, 4: 500}
+BINPP_CAPACITIES = {1: 100, 2: 120, 3: 150}
+BINPP_MIN_WEIGHTS = {1: 1, 2: 20, 4: 30}
+
+
+def uniform(low: int, high: int) -> Distribution:
+    '''Integer weights drawn uniformly in [low, high]'''
+    def draw(rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.integers(low, high, size, endpoint=True)
+    return draw
+
+
+def triplets(capacity: int = 1000) -> Distribution:
+    '''
+        Falkenauer triplets: every three items fill a bin exactly, the
+        first one in [0.38C, 0.49C], the second in [0.25C, (C - w1) / 2]
+        and the third takes the rest. Items are shuffled within a chunk.
+    '''
+    def draw(rng: np.random.Generator, size: int) -> np.ndarray:
+        count = -(-size // 3)
+        first = rng.integers(38 * capacity // 100, 49 * capacity // 100,
+                             count, endpoint=True)
+        second = rng.integers(capacity // 4, (capacity - first) // 2,
+                              endpoint=True)
+        third = capacity - first - second
+        weights = np.stack([first, second, third], axis=1).ravel()
+        return rng.permutation(weights)[:size]
+    return draw
+
+
+def empirical(values: list[int], counts: list[int]) -> Distribution:
+    '''Weights drawn from a histogram, e.g. observed in production'''
+    values = np.asarray(values)
+    p = np.asarray(counts, dtype=np.float64)
+    p /= p.sum()
+
+    def draw(rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.choice(values, size, p=p)
+    return draw
+
+
+def falkenauer_u() -> Spec:
+    '''Falkenauer uniform class: C = 150, weights in [20, 100]'''
+    return (150, uniform(20, 100))
+
+
+def falkenauer_t() -> Spec:
+    '''Falkenauer triplet class: C = 1000, the optimum is n / 3 bins'''
+    return (1000, triplets(1000))
+
+
+def scholl(divisor: int = 3, delta: float = 0.2,
+           capacity: int = 1000) -> Spec:
+    '''
+        Scholl set 2: weights within delta (0.2, 0.5 or 0.9) of an
+        average of C / divisor (3, 5, 7 or 9)
+    '''
+    average = capacity / divisor
+    return (capacity, uniform(round(average * (1 - delta)),
+                              round(average * (1 + delta))))
+
+
+def scholl_hard(capacity: int = 100000) -> Spec:
+    '''Scholl set 3 (hard): C = 100000, weights in [20000, 35000]'''
+    return (capacity, uniform(capacity // 5, 7 * capacity // 20))
+
+
+def histogram(capacity: int, values: list[int], counts: list[int]) -> Spec:
+    '''Weights drawn from a user-supplied histogram'''
+    return (capacity, empirical(values, counts))
+
+
+def binpp(c: int, w: int) -> Spec:
+    '''BinPP class CcWw, for any number of items'''
+    return (BINPP_CAPACITIES[c], uniform(BINPP_MIN_WEIGHTS[w], 100))
+
+
+def binpp_size(n: int) -> int:
+    '''Number of items of the BinPP class Nn'''
+    return BINPP_SIZES[n]
+
+
+def chunks(spec: Spec, n: int, seed: int) -> Iterator[np.ndarray]:
+    '''The weights of an instance, drawn chunk by chunk'''
+    _, draw = spec
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, CHUNK):
+        yield draw(rng, min(CHUNK, n - start))
+
+
+def generate(spec: Spec, n: int, seed: int = 0) -> WeightSet:
+    '''Instance of n items, the same for a given seed'''
+    capacity, _ = spec
+    parts = list(chunks(spec, n, seed))
+    weights = np.concatenate(parts) if parts else np.zeros(0, np.int64)
+    return (capacity, weights.tolist())
+
+
+def stream(spec: Spec, n: int, seed: int = 0) -> WeightStream:
+    '''
+        Same weights as generate(), drawn lazily: memory does not depend
+        on the number of items
+    '''
+    capacity, _ = spec
+
+    def iterator():
+        for chunk in chunks(spec, n, seed):
+            yield from chunk.tolist()
+
+    return (capacity, iterator())
+
+
+def write(filename: str, spec: Spec, n: int, seed: int = 0) -> None:
+    '''Write an instance in the BinPP format, chunk by chunk'''
+    capacity, _ = spec
+    with open(filename, 'w') as f:
+        f.write(f'{n}\n{capacity}\n')
+        for chunk in chunks(spec, n, seed):
+            f.write('\n'.join(map(str, chunk.tolist())))
+            f.write('\n')
@@ -0,0 +1,117 @@
+from math import inf, nan, sqrt
+from typing import Iterable, NamedTuple
+
+
+class Welford():
+    '''
+        Streaming mean and variance (Welford's algorithm) with the extreme
+        values: constant memory, whatever the number of values added
+    '''
+
+    __slots__ = ('count', 'total', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0                # sum of the values
+        self.mean = 0.0
+        self.m2 = 0.0                 # sum of squared deviations
+        self.min = inf
+        self.max = -inf
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other: 'Welford') -> 'Welford':
+        '''Add the values of another accumulator (Chan et al.)'''
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        '''Sample variance, NaN with fewer than two values'''
+        return self.m2 / (self.count - 1) if self.count > 1 else nan
+
+    @property
+    def std(self) -> float:
+        return sqrt(self.variance)
+
+
+class Kpis(NamedTuple):
+    '''KPIs of a solution, NaN when they are not defined'''
+    bins: int
+    unused: float        # average unused room of the bins
+    load_std: float      # sample standard deviation of the bin loads
+    fill: float          # share of the capacity of the bins that is used
+    waste: float         # bins above the lower bound
+    max_load: float
+    min_load: float
+
+
+def kpis(loads: Iterable[int], capacity: int, bound: int = None) -> Kpis:
+    '''
+        KPIs of a solution from the load of its bins (e.g. the loads of a
+        CompactSolution), read in a single pass
+    '''
+    stats = Welford()
+    add = stats.add
+    for load in loads:
+        add(load)
+    if stats.count == 0:
+        return Kpis(0, nan, nan, nan, nan, nan, nan)
+    return Kpis(stats.count, capacity - stats.mean, stats.std,
+                stats.mean / capacity,
+                stats.count - bound if bound is not None else nan,
+                stats.max, stats.min)
+
+
+class KpiAccumulator():
+    '''
+        Running statistics of every KPI over any number of solutions. Only
+        one accumulator per KPI is kept, never the values themselves; NaN
+        values are left out.
+    '''
+
+    def __init__(self) -> None:
+        self.stats = {name: Welford() for name in Kpis._fields}
+
+    def add(self, values: Kpis) -> None:
+        for name, value in zip(Kpis._fields, values):
+            if value == value:
+                self.stats[name].add(value)
+
+    def merge(self, other: 'KpiAccumulator') -> 'KpiAccumulator':
+        for name, stats in self.stats.items():
+            stats.merge(other.stats[name])
+        return self
+
+    def __len__(self) -> int:
+        '''Number of solutions added'''
+        return self.stats['bins'].count
+
+    def __getitem__(self, name: str) -> Welford:
+        return self.stats[name]
+
+    def mean(self) -> Kpis:
+        '''
+            Average of every KPI, as the sum of its values over their
+            count: sum(bins) / len(bins) to the last digit
+        '''
+        return Kpis(*(s.total / s.count if s.count else nan
+                      for s in self.stats.values()))
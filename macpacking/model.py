@@ -1,32 +1,130 @@
 from abc import ABC, abstractmethod
+from functools import cached_property
 from typing import Iterator
 from . import WeightStream, WeightSet, Solution
+from .solution import CompactSolution
 
 
 class BinPacker(ABC):
     pass
 
 
+class Weights(tuple):
+    '''
+        Weights of an instance shared, read-only, by several algorithms:
+        the decreasing order is computed once, on first use
+    '''
+
+    @cached_property
+    def decreasing(self) -> tuple[int]:
+        return tuple(sorted(self, reverse=True))
+
+
+def decreasing(weights: list[int]) -> list[int]:
+    '''Weights by decreasing order, shared when they are Weights'''
+    if isinstance(weights, Weights):
+        return weights.decreasing
+    return sorted(weights, reverse=True)
+
+
+class Session(ABC):
+    '''
+        Incremental packing session of an online algorithm: items are
+        pushed one at a time and placed as soon as they arrive
+    '''
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.solution = CompactSolution()
+        self.closed = False
+
+    def push(self, w: int) -> int:
+        '''Place an item, return the index of its bin'''
+        if self.closed:
+            raise ValueError('The session is closed')
+        return self._push(w)
+
+    def feed(self, stream: Iterator[int]) -> CompactSolution:
+        '''Push every item of a stream, then close the session'''
+        push = self.push
+        for w in stream:
+            push(w)
+        return self.close()
+
+    def snapshot(self) -> CompactSolution:
+        '''Current solution, without copying the placed items'''
+        return self.solution.snapshot()
+
+    def close(self) -> CompactSolution:
+        '''Stop accepting items and return the final solution'''
+        self.closed = True
+        return self.solution
+
+    @abstractmethod
+    def _push(self, w: int) -> int:
+        pass
+
+
 class Online(BinPacker):
 
     def __call__(self, ws: WeightStream) -> Solution:
         capacity, stream = ws
         return self._process(capacity, stream)
 
-    @abstractmethod
+    def compact(self, ws: WeightStream) -> CompactSolution:
+        capacity, stream = ws
+        return self._compact(capacity, stream)
+
+    def open(self, capacity: int) -> Session:
+        '''Start a session to place items as they arrive'''
+        return self._open(capacity)
+
     def _process(self, c: int, stream: Iterator[int]) -> Solution:
-        pass
+        '''Algorithms with sessions only define _open'''
+        return self._compact(c, stream).bins()
+
+    def _compact(self, c: int, stream: Iterator[int]) -> CompactSolution:
+        '''
+            The session's solution, or the one of _process converted when
+            an algorithm defines it
+        '''
+        if type(self)._process is not Online._process:
+            return CompactSolution.from_bins(self._process(c, stream))
+        return self.open(c).feed(stream)
+
+    def _open(self, c: int) -> Session:
+        raise NotImplementedError(
+            f'{type(self).__name__} does not support sessions')
 
 
 class Offline(BinPacker):
 
+    # Online algorithm the decreasing versions give the sorted weights to
+    online: type[Online] = None
+
     def __call__(self, ws: WeightSet) -> Solution:
         capacity, weights = ws
         return self._process(capacity, weights)
 
-    @abstractmethod
+    def compact(self, ws: WeightSet) -> CompactSolution:
+        capacity, weights = ws
+        return self._compact(capacity, weights)
+
     def _process(self, c: int, weights: list[int]) -> Solution:
-        pass
+        '''
+            Decreasing versions delegate to their online algorithm, the
+            other algorithms define _process
+        '''
+        if self.online is None:
+            raise NotImplementedError(
+                f'{type(self).__name__} does not define _process')
+        return self.online()((c, decreasing(weights)))
+
+    def _compact(self, c: int, weights: list[int]) -> CompactSolution:
+        '''Algorithms tracking item assignments build it directly'''
+        if self.online is None:
+            return CompactSolution.from_bins(self._process(c, weights))
+        return self.online().compact((c, decreasing(weights)))
 
 
 class ExtendOffline(BinPacker):
@@ -38,6 +136,14 @@ class ExtendOffline(BinPacker):
         _, weights = ws
         return self._process(weights, bins)
 
+    def compact(self, ws: WeightSet, bins: int) -> CompactSolution:
+        _, weights = ws
+        return self._compact(weights, bins)
+
     @abstractmethod
     def _process(self, weights: list[int], bins: int) -> Solution:
         pass
+
+    def _compact(self, weights: list[int], bins: int) -> CompactSolution:
+        '''Algorithms tracking item assignments build it directly'''
+        return CompactSolution.from_bins(self._process(weights, bins))
@@ -1,17 +1,37 @@
 from abc import ABC, abstractmethod
+from array import array
 from os import path
-from random import shuffle, seed
+from random import Random
+from itertools import islice
+from typing import Iterable, Iterator
 from . import WeightSet, WeightStream
+from .cache import InstanceCache
+import numpy as np
 import csv
+import os
+import re
+import warnings
+
+# Seed of the shuffled order given by the readers
+SEED = 42
 
 
 class DatasetReader(ABC):
 
+    # Parsed instances are cached in binary form, None disables the cache
+    cache: InstanceCache = InstanceCache()
+
+    def __init__(self, seed: int = SEED) -> None:
+        # the shuffled order only depends on the seed, each reader has
+        # its own generator
+        self.seed = seed
+        self.__mapped = None
+
     def offline(self) -> WeightSet:
         '''Return a WeightSet to support an offline algorithm'''
-        (capacity, weights) = self._load_data_from_disk()
-        seed(42)          # always produce the same shuffled result
-        shuffle(weights)  # side effect shuffling
+        (capacity, weights) = self.mapped()
+        weights = weights.tolist()
+        Random(self.seed).shuffle(weights)  # always the same for a seed
         return (capacity, weights)
 
     def online(self) -> WeightStream:
@@ -24,35 +44,175 @@ class DatasetReader(ABC):
 
         return (capacity, iterator())
 
+    def mapped(self) -> tuple[int, memoryview]:
+        '''
+            Capacity and weights in file order, viewed from the cache. The
+            buffer is loaded once and shared by every order of the reader.
+        '''
+        if self.__mapped is None:
+            if self.cache is None:
+                capacity, weights = self._load_data_from_disk()
+                self.__mapped = (capacity, memoryview(array('q', weights)))
+            else:
+                self.__mapped = self.cache.load(
+                    self._sources(), self._load_data_from_disk)
+        return self.__mapped
+
+    def order(self, seed: int = None) -> array:
+        '''
+            Arrival order of the items for a seed (the reader's seed by
+            default), as indices in the weights of mapped(): offline()
+            lists the weights in the order given by its own seed
+        '''
+        indices = list(range(len(self.mapped()[1])))
+        Random(self.seed if seed is None else seed).shuffle(indices)
+        return array('i', indices)
+
+    def orders(self, seeds: Iterable[int]) -> list[array]:
+        '''Arrival orders for several seeds'''
+        return [self.order(s) for s in seeds]
+
+    def stream(self, order: array) -> WeightStream:
+        '''WeightStream following an order, without copying the weights'''
+        (capacity, weights) = self.mapped()
+        return (capacity, map(weights.__getitem__, order))
+
+    def streaming(self, window: int = 0) -> WeightStream:
+        '''
+            WeightStream read lazily from the file, in chunks, using constant
+            memory. Without a window the items come in file order, otherwise
+            they are shuffled within a window of that many items.
+        '''
+        (capacity, stream) = self._stream()
+        if window > 1:
+            stream = window_shuffle(stream, window, Random(self.seed))
+        return (capacity, stream)
+
+    def _stream(self) -> WeightStream:
+        '''Weights in file order, formats read in one go load them all'''
+        (capacity, weights) = self.mapped()
+        return (capacity, iter(weights))
+
     @abstractmethod
     def _load_data_from_disk(self) -> WeightSet:
         '''Method that read the data from disk, depending on the file format'''
         pass
 
+    @abstractmethod
+    def _sources(self) -> list[str]:
+        '''Files the instance is read from'''
+        pass
+
+
+def parse_numbers(data: bytes) -> np.ndarray:
+    '''
+        Whitespace-separated numbers, parsed in one vectorised call: an
+        int64 array, or a float64 array when a number is not an integer
+    '''
+    with warnings.catch_warnings():
+        # numpy only warns when the text cannot be parsed to its end
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(data, dtype=np.int64, sep=' ')
+        except (ValueError, DeprecationWarning):
+            pass
+        try:
+            values = np.fromstring(data, dtype=np.float64, sep=' ')
+        except DeprecationWarning:
+            raise ValueError('The data are not whitespace-separated numbers')
+    if np.all(values == np.floor(values)):
+        return values.astype(np.int64)
+    return values
+
+
+def parse_file(filename: str) -> np.ndarray:
+    '''Every number of a text file, see parse_numbers'''
+    with open(filename, 'rb') as f:
+        return parse_numbers(f.read())
+
+
+def parse_weights(filename: str) -> np.ndarray:
+    '''
+        Every number of an instance file, which must be integers: the
+        readers and their cache only hold integral weights
+    '''
+    values = parse_file(filename)
+    if values.dtype != np.int64:
+        raise ValueError(f'Non-integral weights in [{filename}]')
+    return values
+
+
+def read_weights(filename: str, skip: int = 0,
+                 chunk_size: int = 1 << 16) -> Iterator[int]:
+    '''
+        Integers of a newline-delimited file, read chunk by chunk, after
+        skipping its first lines. Blank lines are ignored.
+    '''
+    with open(filename, 'rb') as f:
+        for _ in range(skip):
+            f.readline()
+        rest = b''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (rest + chunk).split(b'\n')
+            rest = lines.pop()
+            yield from (int(line) for line in lines if line.strip())
+        if rest.strip():
+            yield int(rest)
+
+
+def window_shuffle(stream: Iterator[int], window: int,
+                   rng: Random) -> Iterator[int]:
+    '''
+        Shuffle a stream within a window: the first items fill a buffer,
+        then every new item takes the place of a random buffered one,
+        which is yielded
+    '''
+    buffer = []
+    for w in stream:
+        if len(buffer) < window:
+            buffer.append(w)
+            continue
+        i = rng.randrange(window)
+        yield buffer[i]
+        buffer[i] = w
+    rng.shuffle(buffer)
+    yield from buffer
+
 
 class BinppReader(DatasetReader):
     '''Read problem description according to the BinPP format'''
 
-    def __init__(self, filename: str) -> None:
+    def __init__(self, filename: str, seed: int = SEED) -> None:
         if not path.exists(filename):
             raise ValueError(f'Unkown file [{filename}]')
+        super().__init__(seed)
         self.__filename = filename
 
-    def _load_data_from_disk(self) -> WeightSet:
+    def _sources(self) -> list[str]:
+        return [self.__filename]
+
+    def _stream(self) -> WeightStream:
         with open(self.__filename, 'r') as reader:
             nb_objects: int = int(reader.readline())
             capacity: int = int(reader.readline())
-            weights = []
-            for _ in range(nb_objects):
-                weights.append(int(reader.readline()))
-            return (capacity, weights)
+        weights = read_weights(self.__filename, skip=2)
+        return (capacity, islice(weights, nb_objects))
+
+    def _load_data_from_disk(self) -> WeightSet:
+        values = parse_weights(self.__filename)
+        nb_objects, capacity = int(values[0]), int(values[1])
+        return (capacity, values[2:2 + nb_objects].tolist())
 
 
 class JburkardtReader(DatasetReader):
     '''Read problem description according to the Jburkardt format
        Input: filename should be in format: p0<n>_'''
 
-    def __init__(self, filename: str) -> None:
+    def __init__(self, filename: str, seed: int = SEED) -> None:
+        super().__init__(seed)
         c_filename = filename + 'c.txt'
         w_filename = filename + 'w.txt'
         if not path.exists(c_filename) or not path.exists(w_filename):
@@ -60,6 +220,12 @@ class JburkardtReader(DatasetReader):
         self.__c_filename = c_filename
         self.__w_filename = w_filename
 
+    def _sources(self) -> list[str]:
+        return [self.__c_filename, self.__w_filename]
+
+    def _stream(self) -> WeightStream:
+        return (self._load_c_file(), read_weights(self.__w_filename))
+
     def _load_data_from_disk(self) -> WeightSet:
         capacity: int = self._load_c_file()
         weights: list[int] = self._load_w_file()
@@ -72,14 +238,71 @@ class JburkardtReader(DatasetReader):
 
     # get weights from file
     def _load_w_file(self) -> list[int]:
-        with open(self.__w_filename, 'r') as reader:
-            # Get rid of empty lines at the end of the file
-            content = reader.readlines()
-            content = [line for line in content if line != '\n']
-            weights = []
-            for line in content:
-                weights.append(int(line.strip()))
-            return weights
+        return parse_weights(self.__w_filename).tolist()
+
+
+class WeightLogReader(DatasetReader):
+    '''
+        Read a log of weights, one per line, for bins of a given capacity.
+        Logs can be far larger than memory: use streaming() to read them.
+    '''
+
+    def __init__(self, filename: str, capacity: int, seed: int = SEED) -> None:
+        if not path.exists(filename):
+            raise ValueError(f'Unkown file [{filename}]')
+        super().__init__(seed)
+        self.__filename = filename
+        self.__capacity = capacity
+
+    def mapped(self) -> tuple[int, memoryview]:
+        # the cache is keyed by file, the capacity is not part of it
+        (_, weights) = super().mapped()
+        return (self.__capacity, weights)
+
+    def _sources(self) -> list[str]:
+        return [self.__filename]
+
+    def _stream(self) -> WeightStream:
+        return (self.__capacity, read_weights(self.__filename))
+
+    def _load_data_from_disk(self) -> WeightSet:
+        return (self.__capacity, parse_weights(self.__filename).tolist())
+
+
+class ORLibraryReader():
+    '''
+        Read an OR-Library file holding several instances, such as the
+        Falkenauer binpack1..8 sets: the number of instances, then for
+        each of them its name, a line with the capacity, the number of
+        items and the best known number of bins, and the weights. The
+        instances are given in file order, their weights as well.
+    '''
+
+    def __init__(self, filename: str) -> None:
+        if not path.exists(filename):
+            raise ValueError(f'Unkown file [{filename}]')
+        self.__filename = filename
+        self.best: dict[str, int] = {}
+
+    def __iter__(self) -> Iterator[tuple[int, list[int]]]:
+        for _, ws in self.instances():
+            yield ws
+
+    def instances(self) -> Iterator[tuple[str, tuple[int, list[int]]]]:
+        '''Name and WeightSet of every instance of the file'''
+        with open(self.__filename, 'rb') as f:
+            tokens = f.read().split()
+        position = 1
+        for _ in range(int(tokens[0])):
+            name = tokens[position].decode()
+            capacity, nb_objects, best = \
+                parse_numbers(b' '.join(tokens[position + 1:position + 4]))
+            position += 4
+            weights = parse_numbers(
+                b' '.join(tokens[position:position + nb_objects]))
+            position += int(nb_objects)
+            self.best[name] = int(best)
+            yield (name, (capacity.item(), weights.tolist()))
 
 
 class OracleReader():
@@ -98,3 +321,76 @@ class OracleReader():
             for row in spamreader:
                 optimal_sol[row[0]] = int(row[1])
             return optimal_sol
+
+
+class OracleRegistry():
+    '''
+        Optimal solutions of every dataset with an oracle file, read once.
+        Instance names are normalised the same way everywhere: the folder
+        and extension are dropped and the jburkardt names p01, p-01 and
+        p01_ all become p_01.
+    '''
+
+    def __init__(self, folder: str = '_datasets') -> None:
+        self.folder = folder
+        self.__datasets: dict[str, dict[str, int]] = None
+        self.__optimum: dict[str, int] = None
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        name = os.path.basename(name).split('.')[0]
+        match = re.fullmatch(r'([a-z])[-_]?(\d+)_?', name)
+        if match is not None:
+            return f'{match.group(1)}_{match.group(2)}'
+        return name
+
+    def dataset(self, dataset: str) -> dict[str, int]:
+        '''Optimal solutions of a dataset, by instance name'''
+        return self._load().get(dataset, {})
+
+    def get(self, name: str, default: int = None) -> int:
+        if self.__optimum is None:
+            self._load()
+        return self.__optimum.get(self.normalize(name), default)
+
+    def lookup(self, names: list[str]) -> list[int]:
+        '''Optimal solutions of several instances, None when unknown'''
+        if self.__optimum is None:
+            self._load()
+        get, normalize = self.__optimum.get, self.normalize
+        return [get(normalize(name)) for name in names]
+
+    def __getitem__(self, name: str) -> int:
+        optimum = self.get(name)
+        if optimum is None:
+            raise KeyError(name)
+        return optimum
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def _load(self) -> dict[str, dict[str, int]]:
+        if self.__datasets is None:
+            self.__datasets, self.__optimum = {}, {}
+            suffix = '_oracle.csv'
+            for f in sorted(os.listdir(self.folder)):
+                if f.endswith(suffix):
+                    reader = OracleReader(f[:-len(suffix)])
+                    reader.path = f'{self.folder}/{f}'
+                    optimum = {self.normalize(name): value
+                               for name, value in reader.read_file().items()}
+                    self.__datasets[f[:-len(suffix)]] = optimum
+                    self.__optimum.update(optimum)
+        return self.__datasets
+
+
+# Registry of the _datasets folder, shared by the whole process
+_oracles: OracleRegistry = None
+
+
+def oracles() -> OracleRegistry:
+    '''The oracle registry of the _datasets folder'''
+    global _oracles
+    if _oracles is None:
+        _oracles = OracleRegistry()
+    return _oracles
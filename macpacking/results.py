@@ -0,0 +1,140 @@
+from .catalog import Entry
+import numpy as np
+
+# Numeric columns of a result table, one value per (algorithm, instance)
+COLUMNS = {
+    'bins': np.int32,
+    'optimum': np.int32,
+    'lower_bound': np.int32,
+    'capacity': np.int32,
+    'runtime': np.float64,       # seconds, NaN when unknown
+    'unused': np.float64,        # average unused room of the bins
+    'load_std': np.float64,      # standard deviation of the bin loads
+    'N': np.int8,                # BinPP parameters, -1 for other datasets
+    'C': np.int8,
+    'W': np.int8,
+}
+
+# Categorical columns, stored as codes into a list of labels
+LABELS = ['algo', 'instance', 'family', 'dataset']
+
+
+class ResultTable():
+    '''
+        Columnar table of results, one row per (algorithm, instance). It
+        is saved as a single compressed .npz file, filtered with boolean
+        masks, and derives the metrics of the analyses from its columns.
+    '''
+
+    def __init__(self, columns: dict[str, np.ndarray],
+                 labels: dict[str, list[str]]) -> None:
+        self.columns = columns
+        self.labels = labels
+
+    @staticmethod
+    def build(rows: list[tuple[str, Entry, int, int, int, float,
+                               list[int]]]) -> 'ResultTable':
+        '''
+            Table of (algorithm, entry, bins, optimum, lower bound,
+            runtime, bin loads) rows
+        '''
+        values = {name: [] for name in list(COLUMNS) + LABELS}
+        for algo, entry, bins, optimum, bound, runtime, loads in rows:
+            params = entry.params or {}
+            loads = np.asarray(loads, dtype=np.float64)
+            values['algo'].append(algo)
+            values['instance'].append(entry.name)
+            values['family'].append(entry.family)
+            values['dataset'].append(entry.dataset)
+            values['bins'].append(bins)
+            values['optimum'].append(optimum)
+            values['lower_bound'].append(bound)
+            values['capacity'].append(entry.capacity)
+            values['runtime'].append(np.nan if runtime is None else runtime)
+            values['unused'].append(
+                entry.capacity - loads.mean() if len(loads) else np.nan)
+            values['load_std'].append(
+                loads.std(ddof=1) if len(loads) > 1 else np.nan)
+            for p in 'NCW':
+                values[p].append(params.get(p, -1))
+        columns, labels = {}, {}
+        for name, dtype in COLUMNS.items():
+            columns[name] = np.asarray(values[name], dtype=dtype)
+        for name in LABELS:
+            labels[name], codes = np.unique(
+                np.asarray(values[name], dtype=str), return_inverse=True)
+            labels[name] = labels[name].tolist()
+            columns[name] = codes.astype(np.int32)
+        return ResultTable(columns, labels)
+
+    def __len__(self) -> int:
+        return len(self.columns['bins'])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        '''Column, as labels for the categorical ones'''
+        if name in self.labels:
+            return np.asarray(self.labels[name])[self.columns[name]]
+        return self.columns[name]
+
+    def where(self, **conditions) -> 'ResultTable':
+        '''
+            Rows matching every condition, e.g. where(algo='Offline
+            FirstFit', N=2); a list of values matches any of them
+        '''
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in conditions.items():
+            values = value if isinstance(value, list) else [value]
+            if name in self.labels:
+                codes = [self.labels[name].index(v) for v in values
+                         if v in self.labels[name]]
+                mask &= np.isin(self.columns[name], codes)
+            else:
+                mask &= np.isin(self.columns[name], values)
+        return ResultTable({k: c[mask] for k, c in self.columns.items()},
+                           self.labels)
+
+    def gap(self) -> np.ndarray:
+        '''Bins above the optimum'''
+        return self.columns['bins'] - self.columns['optimum']
+
+    def normalized_gap(self) -> np.ndarray:
+        '''Bins above the optimum, relative to the optimum'''
+        return self.gap() / self.columns['optimum']
+
+    def optimal(self) -> np.ndarray:
+        return self.gap() == 0
+
+    def bound_gap(self) -> np.ndarray:
+        '''Bins above the lower bound'''
+        return self.columns['bins'] - self.columns['lower_bound']
+
+    def summary(self, by: str = 'algo') -> dict[str, dict[str, float]]:
+        '''Mean gap, normalized gap, optimal share and runtime per group'''
+        result = {}
+        for code, label in enumerate(self.labels[by]):
+            group = self.columns[by] == code
+            if not group.any():
+                continue
+            runtime = self.columns['runtime'][group]
+            runtime = runtime[~np.isnan(runtime)]
+            result[label] = {
+                'gap': float(self.gap()[group].mean()),
+                'normalized_gap': float(self.normalized_gap()[group].mean()),
+                'optimal': float(self.optimal()[group].mean()),
+                'runtime': float(runtime.mean()) if len(runtime) else np.nan,
+            }
+        return result
+
+    def save(self, filename: str) -> None:
+        arrays = dict(self.columns)
+        for name, labels in self.labels.items():
+            arrays[f'{name}_labels'] = np.asarray(labels, dtype=str)
+        np.savez_compressed(filename, **arrays)
+
+    @staticmethod
+    def load(filename: str) -> 'ResultTable':
+        with np.load(filename) as data:
+            columns = {name: data[name] for name in list(COLUMNS) + LABELS}
+            labels = {name: data[f'{name}_labels'].tolist()
+                      for name in LABELS}
+        return ResultTable(columns, labels)
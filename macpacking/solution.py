@@ -0,0 +1,136 @@
+from array import array
+from itertools import islice
+from typing import Iterator
+from . import Solution
+
+
+class CompactSolution():
+    '''
+        Array-backed representation of a solution: the weight and the bin
+        of every item (in packing order) and the load of every bin. The
+        usual list of bins is only built when it is asked for.
+    '''
+
+    def __init__(self) -> None:
+        self.weights = array('i')     # weight of each item
+        self.assignment = array('i')  # bin index of each item
+        self.__loads = array('q')     # load of each bin
+        self.__bins: Solution = None  # cached list-of-lists view
+        self.__size: int = None       # number of items seen by a snapshot
+        self.__count: int = None      # number of bins seen by a snapshot
+
+    @staticmethod
+    def from_bins(bins: Solution) -> 'CompactSolution':
+        '''Build a compact solution from a list of bins'''
+        solution = CompactSolution()
+        for items in bins:
+            index = solution.new_bin()
+            for w in items:
+                solution.place(w, index)
+        return solution
+
+    def snapshot(self) -> 'CompactSolution':
+        '''
+            Read-only view of the current state, taken in O(1): the item
+            buffers are shared (they are only ever appended to) and the bin
+            loads of the view are summed from its items on first use
+        '''
+        view = CompactSolution()
+        view.weights = self.weights
+        view.assignment = self.assignment
+        view.__loads = None
+        view.__size = self.size
+        view.__count = self.count
+        return view
+
+    @property
+    def loads(self) -> array:
+        '''Load of each bin'''
+        if self.__loads is None:
+            # first use of a snapshot's loads
+            loads = array('d' if self.weights.typecode == 'd' else 'q',
+                          bytes(8 * self.__count))
+            items = zip(self.weights, self.assignment)
+            for w, bin_index in islice(items, self.__size):
+                loads[bin_index] += w
+            self.__loads = loads
+        return self.__loads
+
+    @loads.setter
+    def loads(self, loads: array) -> None:
+        self.__loads = loads
+
+    def new_bin(self) -> int:
+        '''Open an empty bin, return its index'''
+        if self.__size is not None:
+            raise ValueError('A snapshot cannot be modified')
+        self.__loads.append(0)
+        self.__bins = None
+        return len(self.__loads) - 1
+
+    def place(self, w: int, bin_index: int) -> None:
+        '''Put an item of weight w into a bin'''
+        if self.__size is not None:
+            raise ValueError('A snapshot cannot be modified')
+        try:
+            self.weights.append(w)
+        except OverflowError:
+            # weights beyond 32 bits
+            self.weights = array('q', self.weights)
+            self.weights.append(w)
+        except TypeError:
+            # non-integer weights: switch to double precision buffers
+            self.weights = array('d', self.weights)
+            self.__loads = array('d', self.__loads)
+            self.weights.append(w)
+        self.assignment.append(bin_index)
+        self.__loads[bin_index] += w
+        self.__bins = None
+
+    @property
+    def count(self) -> int:
+        '''Number of bins used'''
+        if self.__count is not None:
+            return self.__count
+        return len(self.__loads)
+
+    @property
+    def size(self) -> int:
+        '''Number of items packed'''
+        if self.__size is not None:
+            return self.__size
+        return len(self.assignment)
+
+    def bins(self) -> Solution:
+        '''List-of-lists view of the solution, built on first use'''
+        if self.__bins is None:
+            bins = [[] for _ in range(self.count)]
+            items = zip(self.weights, self.assignment)
+            for w, bin_index in islice(items, self.size):
+                bins[bin_index].append(w)
+            self.__bins = bins
+        return self.__bins
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[list[int]]:
+        return iter(self.bins())
+
+    def __getitem__(self, index: int) -> list[int]:
+        return self.bins()[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactSolution):
+            other = other.bins()
+        return self.bins() == other
+
+    def __repr__(self) -> str:
+        return f'CompactSolution({self.bins()})'
+
+
+def bin_loads(solution: Solution) -> list[int]:
+    '''Load of every bin, without rescanning a compact solution'''
+    if isinstance(solution, CompactSolution):
+        return solution.loads
+    return [sum(items) for items in solution]
@@ -0,0 +1,18 @@
+from typing import Callable
+import pytest
+
+
+@pytest.fixture
+def weights() -> tuple[int, list[int]]:
+    # FirstFit/BestFit decreasing need 4 bins, the optimum is 3
+    return 100, [28, 52, 14, 18, 8, 18, 59, 48, 34, 15]
+
+
+@pytest.fixture
+def valid() -> Callable[[int, list[int], list[list[int]]], bool]:
+    '''Check that a solution packs every item within the capacity'''
+    def check(capacity: int, items: list[int],
+              solution: list[list[int]]) -> bool:
+        return sorted(sum(solution, [])) == sorted(items) and \
+            all(sum(b) <= capacity for b in solution)
+    return check
@@ -9,6 +9,11 @@ from macpacking.algorithms.online import (NextFit as on_nf,
                                           BestFit as on_bf,
                                           WorstFit as on_wf)
 from utils.algo_util import get_algo_name
+from utils.algo_runner import run_in_folder
+from macpacking.catalog import Catalog, catalog
+from macpacking.results import ResultTable
+import json
+import matplotlib.pyplot as plt
 
 
 @pytest.fixture
@@ -27,7 +32,8 @@ def setup_analyst2() -> Analyst:
                       ['binpp', 'binpp-hard', 'jburkardt'],
                       'test_discrete_out.json',
                       'test_continuous_out.json',
-                      'test_normalized_out.json')
+                      'test_normalized_out.json',
+                      'test_results.npz')
     analyst.obtain_op_results()
     analyst.obtain_results()
     return analyst
@@ -46,14 +52,81 @@ def test_result(setup_analyst1):
 
 
 def test_read_write(setup_analyst2):
-    setup_analyst2.write_result()
-    assert Analyst.read_result('outputs/test_discrete_out.json',
-                               'outputs/test_continuous_out.json',
-                               'outputs/test_normalized_out.json') == \
-        (setup_analyst2.discrete,
-         setup_analyst2.continuous,
-         setup_analyst2.normalize_continuous)
+    expected = (setup_analyst2.discrete, setup_analyst2.continuous,
+                setup_analyst2.normalize_continuous)
+    setup_analyst2.write_result(export_json=True)
+    assert Analyst.read_result('outputs/test_results.npz') == expected
+    assert Analyst.read_json('outputs/test_discrete_out.json',
+                             'outputs/test_continuous_out.json',
+                             'outputs/test_normalized_out.json') == expected
 
 
 def test_utils():
     assert len(Analyst.gen_binpp_path()) == 36
+
+
+def test_parallel_results(setup_analyst1):
+    analyst = Analyst([off_nf, off_ff, off_bf, off_wf], [
+                      on_nf, on_ff, on_bf, on_wf], ['jburkardt'])
+    analyst.obtain_op_results()
+    analyst.obtain_results(workers=2)
+    assert json.dumps(analyst.continuous) == \
+        json.dumps(setup_analyst1.continuous)
+    assert json.dumps(analyst.discrete) == json.dumps(setup_analyst1.discrete)
+    serial = run_in_folder(on_ff, 'binpp/N1C1W1', [0] * 20)
+    assert run_in_folder(on_ff, 'binpp/N1C1W1', [0] * 20, workers=2) == serial
+    assert list(serial) == [e.key for e in catalog().folder('binpp/N1C1W1')]
+
+
+def test_unknown_folder(monkeypatch):
+    known = run_in_folder(on_ff, 'binpp/N1C1W1', [0] * 20)
+    # a folder missing from the catalog is scanned
+    monkeypatch.setattr('utils.algo_runner.catalog', lambda: Catalog([]))
+    scanned = run_in_folder(on_ff, 'binpp/N1C1W1', [0] * 20)
+    assert sorted(scanned) == sorted(known)
+    assert all(scanned[k].bins() == known[k].bins() for k in known)
+    with pytest.raises(FileNotFoundError):
+        run_in_folder(on_ff, 'nowhere', [])
+
+
+def test_table(setup_analyst2):
+    table = setup_analyst2.table
+    # one row per (algorithm, instance)
+    assert len(table) == 8 * (720 + 10 + 4)
+    setup_analyst2.write_result()
+    loaded = ResultTable.load('outputs/test_results.npz')
+    assert loaded.labels == table.labels
+    assert all((loaded[c] == table[c]).all() for c in ['bins', 'optimum'])
+    ff = table.where(algo=get_algo_name(off_ff))
+    assert len(ff) == 734
+    assert dict(zip(ff['instance'], ff.gap())) == \
+        setup_analyst2.continuous[get_algo_name(off_ff)]
+    assert (ff.bound_gap() >= ff.gap()).all()
+    small = table.where(N=1, C=[1, 2], dataset='binpp')
+    assert len(small) == 8 * 120
+    assert set(small['family']) == {f'N1C{c}W{w}' for c in (1, 2)
+                                    for w in (1, 2, 4)}
+    summary = table.summary()
+    assert summary[get_algo_name(off_ff)]['optimal'] == \
+        pytest.approx(ff.optimal().mean())
+    assert summary[get_algo_name(on_nf)]['runtime'] > 0
+
+
+def test_plot_committed(monkeypatch):
+    # without a table, the committed .json files are plotted as they are
+    analyst = Analyst([off_ff], [on_ff], ['binpp', 'binpp-hard', 'jburkardt'],
+                      out4='test_missing.npz')
+
+    def obtain_results(workers: int = 1) -> None:
+        raise AssertionError('the results are read, not obtained')
+
+    monkeypatch.setattr(analyst, 'obtain_results', obtain_results)
+    plt.close('all')
+    analyst.plot_result()
+    _, _, normalized = Analyst.read_json('outputs/discrete_out.json',
+                                         'outputs/continuous_out.json',
+                                         'outputs/normalized_out.json')
+    [line, *_] = plt.figure(0).axes[0].lines
+    assert list(line.get_ydata()) == \
+        list(normalized[line.get_label()].values())
+    plt.close('all')
@@ -0,0 +1,55 @@
+from macpacking.batch import (Batch, load_family, load_families, next_fit,
+                              first_fit, best_fit, worst_fit)
+from macpacking.algorithms.offline import (NextFit as off_nf,
+                                           FirstFit as off_ff,
+                                           BestFit as off_bf,
+                                           WorstFit as off_wf)
+from macpacking.algorithms.online import (NextFit as on_nf,
+                                          FirstFit as on_ff,
+                                          BestFit as on_bf,
+                                          WorstFit as on_wf)
+from macpacking.reader import BinppReader
+import pytest
+
+FOLDER = '_datasets/binpp/N2C1W2'
+
+
+@pytest.fixture
+def batch() -> Batch:
+    return load_family(FOLDER)
+
+
+@pytest.mark.parametrize(['engine', 'on_algo', 'off_algo'],
+                         [(next_fit, on_nf, off_nf),
+                          (first_fit, on_ff, off_ff),
+                          (best_fit, on_bf, off_bf),
+                          (worst_fit, on_wf, off_wf)])
+def test_same_bins(batch, engine, on_algo, off_algo):
+    online = engine(batch)
+    offline = engine(batch.decreasing())
+    for row, name in enumerate(batch.names):
+        data = BinppReader(f'{FOLDER}/{name}.BPP.txt').offline()
+        assert online.solution(row) == on_algo()(data)
+        assert offline.solution(row) == off_algo()(data)
+        assert offline.bins()[name] == len(off_algo()(data))
+
+
+def test_padding():
+    batch = Batch.from_sets(['a', 'b'], [(10, [6, 6, 6]), (10, [3])])
+    result = first_fit(batch)
+    assert result.counts.tolist() == [3, 1]
+    assert result.solution(1).bins() == [[3]]
+    assert list(result.solution(0).loads) == [6, 6, 6]
+
+
+def test_load_families():
+    folders = [FOLDER, '_datasets/binpp/N1C3W4']
+    batch = load_families(folders)
+    assert len(batch) == 40
+    assert batch.names[:20] == load_family(FOLDER).names
+    assert batch.weights.shape[1] == 100
+    assert batch.sizes[20:].tolist() == [50] * 20
+    result = next_fit(batch.decreasing())
+    data = BinppReader('_datasets/binpp/N1C3W4/N1C3W4_A.BPP.txt').offline()
+    assert result.bins()['N1C3W4_A'] == len(off_nf()(data))
+    assert len(load_families()) == 720
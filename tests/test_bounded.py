@@ -0,0 +1,57 @@
+from macpacking.algorithms.bounded import FirstKFit, BestKFit, JsonlSink
+from macpacking.algorithms.online import NextFit, BestFit
+from macpacking.reader import JburkardtReader
+import json
+import pytest
+
+
+@pytest.fixture
+def weights() -> tuple[int, list[int]]:
+    capacity, stream = JburkardtReader('_datasets/jburkardt/p02_').online()
+    return capacity, list(stream)
+
+
+@pytest.mark.parametrize('algo', [FirstKFit, BestKFit])
+def test_one_open_bin_is_next_fit(algo, weights):
+    capacity, items = weights
+    assert algo(1)((capacity, iter(items))) == \
+        NextFit()((capacity, iter(items)))
+
+
+def test_unbounded_best_k_fit_is_best_fit(weights):
+    capacity, items = weights
+    assert BestKFit(len(items))((capacity, iter(items))) == \
+        BestFit()((capacity, iter(items)))
+
+
+def test_first_k_fit():
+    assert FirstKFit(2)((10, iter([6, 6, 3, 5, 4, 1]))) == \
+        [[6, 3], [6, 4], [5, 1]]
+
+
+def test_session_bounded_memory():
+    closed = []
+    session = BestKFit(2, closed.append).open(10)
+    for w in [6, 6, 7, 2, 9, 1]:
+        session.push(w)
+        assert len(session.snapshot()) <= 2
+    assert closed == [(0, [6]), (2, [7, 2])]
+    assert session.close() == 4
+    assert closed[2:] == [(1, [6]), (3, [9, 1])]
+
+
+def test_jsonl_sink(tmp_path, weights):
+    capacity, items = weights
+    filename = tmp_path / 'bins.jsonl'
+    with JsonlSink(filename) as sink:
+        bins = FirstKFit(2, sink).open(capacity).feed(iter(items))
+    with open(filename) as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(w for line in lines for w in line['items']) == \
+        sorted(items)
+    assert len(lines) == bins
+
+
+def test_call_with_sink():
+    with pytest.raises(ValueError):
+        FirstKFit(2, [].append)((10, iter([6, 6])))
@@ -0,0 +1,62 @@
+from macpacking.bounds import l1, l2, l3, lower_bound, is_optimal, reduce
+from macpacking.analyst import Analyst
+from macpacking.catalog import catalog
+from macpacking.algorithms.exact import BranchAndBound
+from macpacking.algorithms.offline import FirstFit as off_ff
+from macpacking.algorithms.online import FirstFit as on_ff
+from macpacking.reader import JburkardtReader
+
+
+def test_l1():
+    assert l1(10, [6, 6, 6]) == 2
+    assert l1(10, []) == 0
+
+
+def test_l2():
+    # items above half the capacity need a bin each
+    assert l2(10, [6, 6, 6]) == 3
+    assert l2(10, [6, 6, 6, 4, 4, 4]) == 3
+
+
+def test_l3():
+    weights = [2, 2, 4, 5, 7]
+    assert l2(10, weights) == 2
+    assert l3(10, weights) == 3
+
+
+def test_lower_bound_oracle():
+    # p_04 has an optimum of 7 bins, FirstFit decreasing uses 8
+    data = JburkardtReader('_datasets/jburkardt/p04_').offline()
+    assert lower_bound(data) == 7
+    assert is_optimal(data, 7)
+    assert not is_optimal(data, len(off_ff()(data)))
+
+
+def test_analyst_fallback(monkeypatch):
+    runs = []
+
+    class Solver(BranchAndBound):
+        def _process(self, capacity, weights):
+            runs.append(capacity)
+            return super()._process(capacity, weights)
+
+    monkeypatch.setattr('macpacking.analyst.BranchAndBound', Solver)
+    analyst = Analyst([off_ff], [on_ff], ['jburkardt'])
+    analyst.op_results = {}
+    # p_01 has an optimum of 4 bins, found without the oracle
+    entry = catalog().get('p_01')
+    assert analyst._optimum(entry) == 4
+    # the solver runs once per instance, not once per algorithm
+    assert analyst._optimum(entry) == 4
+    assert len(runs) == 1
+
+
+def test_reduce():
+    # 9 + 1 and 6 + 4 fill their bins, then 3 + 3 is all that is left
+    fixed, rest = reduce(10, [4, 6, 9, 1, 3, 3])
+    assert fixed == [[9, 1], [6, 4], [3, 3]]
+    assert rest == []
+    # 3 + 2 fits with 5 and outweighs every single item
+    fixed, rest = reduce(10, [5, 3, 2, 2])
+    assert fixed == []
+    assert rest == [5, 3, 2, 2]
@@ -0,0 +1,55 @@
+from macpacking.cache import InstanceCache
+from macpacking.reader import DatasetReader, BinppReader, JburkardtReader
+import os
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> InstanceCache:
+    cache = InstanceCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(DatasetReader, 'cache', cache)
+    return cache
+
+
+@pytest.fixture
+def instance(tmp_path) -> str:
+    filename = tmp_path / 'instance.txt'
+    filename.write_text('4\n10\n6\n4\n5\n5\n')
+    return str(filename)
+
+
+def test_parse_once(cache, instance):
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return (10, [6, 4, 5, 5])
+
+    parsed = cache.load([instance], parse)[1]
+    capacity, weights = cache.load([instance], parse)
+    assert (capacity, weights.tolist()) == (10, parsed.tolist())
+    # the second read is a read-only view on the mapped file
+    assert not parsed.readonly and weights.readonly
+    assert len(calls) == 1
+
+
+def test_invalidated(cache, instance):
+    assert BinppReader(instance).mapped()[1].tolist() == [6, 4, 5, 5]
+    with open(instance, 'w') as f:
+        f.write('2\n10\n7\n3\n')
+    stat = os.stat(instance)
+    os.utime(instance, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert BinppReader(instance).mapped()[1].tolist() == [7, 3]
+
+
+def test_same_as_text(cache):
+    readers = [lambda: BinppReader('_datasets/binpp/N1C1W1/N1C1W1_B.BPP.txt'),
+               lambda: JburkardtReader('_datasets/jburkardt/p02_')]
+    for reader in readers:
+        cached = [reader().offline(), reader().offline()]
+        DatasetReader.cache = None
+        assert cached == [reader().offline()] * 2
+        DatasetReader.cache = cache
+    assert len(os.listdir(cache.folder)) == 2
+    cache.clear()
+    assert os.listdir(cache.folder) == []
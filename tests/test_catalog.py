@@ -0,0 +1,56 @@
+from macpacking.catalog import Catalog, catalog
+import os
+import pytest
+
+
+@pytest.fixture
+def index() -> Catalog:
+    return catalog()
+
+
+def test_entries(index):
+    assert len(index.dataset('binpp')) == 720
+    assert len(index.dataset('binpp-hard')) == 10
+    entry = index.get('N1C1W1_B')
+    assert (entry.family, entry.params) == ('N1C1W1', {'N': 1, 'C': 1, 'W': 1})
+    assert (entry.n, entry.capacity, entry.optimum) == (50, 100, 31)
+    assert entry.open().offline()[0] == 100
+    # the runners name the jburkardt results p-01, the oracle p_01
+    assert index.get('p-01') == index.get('p_01')
+    assert index.get('p_01').reader == 'JburkardtReader'
+
+
+def test_lookups(index):
+    assert len(index.folders('binpp')) == 36
+    assert len(index.family('N2C3W4')) == 20
+    assert all(e.params['C'] == 2 for e in index.where(N=1, C=2))
+    assert len(index.where(N=1, C=2)) == 60
+    assert index.where(N=9) == []
+
+
+def test_persisted(tmp_path):
+    root = tmp_path / 'datasets'
+    (root / 'binpp-hard').mkdir(parents=True)
+    (root / 'binpp-hard' / 'HARD0.BPP.txt').write_text('2\n10\n6\n4\n')
+    assert [e.n for e in Catalog.load(str(root)).entries] == [2]
+    assert os.path.exists(root / '_catalog.json')
+    (root / 'binpp-hard' / 'HARD1.BPP.txt').write_text('1\n10\n6\n')
+    # a new file changes the folder, the catalog is rebuilt
+    assert len(Catalog.load(str(root))) == 2
+    # so does an instance edited in place
+    (root / 'binpp-hard' / 'HARD1.BPP.txt').write_text('3\n10\n6\n2\n1\n')
+    assert sorted(e.n for e in Catalog.load(str(root)).entries) == [2, 3]
+
+
+def test_scan(tmp_path):
+    (tmp_path / 'mine').mkdir()
+    (tmp_path / 'mine' / 'A.txt').write_text('2\n10\n6\n4\n')
+    (tmp_path / 'jburkardt-copy').mkdir()
+    (tmp_path / 'jburkardt-copy' / 'p01_c.txt').write_text('10\n')
+    (tmp_path / 'jburkardt-copy' / 'p01_w.txt').write_text('6\n4\n3\n')
+    [entry] = Catalog.scan('mine', str(tmp_path))
+    assert (entry.key, entry.n, entry.optimum) == ('A', 2, None)
+    [entry] = Catalog.scan('jburkardt-copy', str(tmp_path))
+    assert (entry.key, entry.n, entry.reader) == ('p-01', 3, 'JburkardtReader')
+    with pytest.raises(FileNotFoundError):
+        Catalog.scan('nowhere', str(tmp_path))
@@ -0,0 +1,75 @@
+from macpacking.algorithms.exact import BranchAndBound
+from macpacking.algorithms.offline import FirstFit
+from macpacking.reader import BinppReader
+from threading import Event
+import pytest
+
+
+def test_beats_greedy(weights, valid):
+    capacity, items = weights
+    solver = BranchAndBound()
+    solution = solver(weights)
+    assert len([b for b in FirstFit()(weights) if b]) == 4
+    assert len(solution) == 3
+    assert solver.proven
+    assert valid(capacity, items, solution)
+
+
+def test_greedy_proven():
+    solver = BranchAndBound()
+    assert solver((10, [6, 4, 5, 5])) == [[6, 4], [5, 5]]
+    assert solver.proven and solver.bound == 2
+
+
+def test_node_budget(weights, valid):
+    capacity, items = weights
+    solver = BranchAndBound(node_budget=1)
+    solution = solver(weights)
+    # out of budget: the greedy incumbent is returned, not proven
+    assert not solver.proven
+    assert len(solution) == 4
+    assert valid(capacity, items, solution)
+
+
+def test_binpp(valid):
+    data = BinppReader('_datasets/binpp/N1C1W1/N1C1W1_A.BPP.txt').offline()
+    solver = BranchAndBound()
+    solution = solver(data)
+    # the oracle gives 25 bins
+    assert len(solution) == 25
+    assert solver.proven
+    assert valid(*data, solution)
+
+
+def test_lower_bound_raised(valid):
+    data = BinppReader('_datasets/binpp/N2C1W1/N2C1W1_A.BPP.txt').offline()
+    solver = BranchAndBound()
+    solution = solver(data)
+    # L3 gives 47 bins, the oracle 48: the LP relaxation closes the gap
+    assert len(solution) == 48
+    assert solver.proven and solver.bound == 48
+    assert valid(*data, solution)
+
+
+@pytest.mark.parametrize('name', ['N2C3W4_C', 'N3C3W1_E'])
+def test_beats_greedy_binpp(name, valid):
+    folder = name.split('_')[0]
+    data = BinppReader(f'_datasets/binpp/{folder}/{name}.BPP.txt').offline()
+    solver = BranchAndBound()
+    solution = solver(data)
+    # FirstFit/BestFit decreasing are one bin above the oracle
+    assert len(solution) == {'N2C3W4_C': 42, 'N3C3W1_E': 68}[name]
+    assert solver.proven
+    assert valid(*data, solution)
+
+
+def test_cancelled(valid):
+    data = BinppReader('_datasets/binpp/N2C1W1/N2C1W1_A.BPP.txt').offline()
+    cancel = Event()
+    cancel.set()
+    solver = BranchAndBound(cancel=cancel)
+    solution = solver(data)
+    # stopped before the LP relaxation could raise the bound
+    assert not solver.proven and solver.bound == 47
+    assert len(solution) >= 48
+    assert valid(*data, solution)
@@ -0,0 +1,47 @@
+from macpacking import generator
+from macpacking.reader import BinppReader
+from macpacking.algorithms.offline import FirstFit
+import pytest
+
+
+@pytest.mark.parametrize('spec', [
+    generator.falkenauer_u(), generator.falkenauer_t(),
+    generator.scholl(5, 0.5), generator.scholl_hard(),
+    generator.binpp(2, 4), generator.histogram(100, [10, 50, 90], [1, 2, 1])])
+def test_deterministic(spec):
+    capacity, weights = generator.generate(spec, 1000, seed=3)
+    assert generator.generate(spec, 1000, seed=3) == (capacity, weights)
+    assert generator.generate(spec, 1000, seed=4) != (capacity, weights)
+    assert len(weights) == 1000
+    assert all(0 < w <= capacity for w in weights)
+    stream_capacity, stream = generator.stream(spec, 1000, seed=3)
+    assert (stream_capacity, list(stream)) == (capacity, weights)
+
+
+def test_classes():
+    _, weights = generator.generate(generator.binpp(3, 2), 10**5)
+    assert (min(weights), max(weights)) == (20, 100)
+    # triplets fill n / 3 bins exactly
+    capacity, weights = generator.generate(generator.falkenauer_t(), 300)
+    assert sum(weights) == 100 * capacity
+    assert all(250 <= w <= 490 for w in weights)
+    _, weights = generator.generate(generator.scholl(3, 0.2), 1000)
+    assert 267 <= min(weights) and max(weights) <= 400
+    _, weights = generator.generate(generator.histogram(9, [7], [1]), 10)
+    assert weights == [7] * 10
+    assert generator.binpp_size(4) == 500
+
+
+def test_large_stream():
+    capacity, stream = generator.stream(generator.falkenauer_u(), 10**6)
+    assert sum(1 for _ in stream) == 10**6
+
+
+def test_write(tmp_path):
+    filename = str(tmp_path / 'instance.BPP.txt')
+    spec = generator.binpp(1, 1)
+    generator.write(filename, spec, 2 * generator.CHUNK + 5, seed=1)
+    capacity, weights = BinppReader(filename).mapped()
+    assert (capacity, weights.tolist()) == \
+        generator.generate(spec, 2 * generator.CHUNK + 5, seed=1)
+    assert len(FirstFit()(BinppReader(filename).offline())) > 0
@@ -0,0 +1,33 @@
+from macpacking.algorithms.histogram import (compress,
+                                             HistogramNextFit as hist_nf,
+                                             HistogramFirstFit as hist_ff,
+                                             HistogramBestFit as hist_bf)
+from macpacking.algorithms.offline import (NextFit as off_nf,
+                                           FirstFit as off_ff,
+                                           BestFit as off_bf)
+from macpacking.reader import BinppReader
+import pytest
+
+
+def test_compress():
+    assert compress([3, 5, 3, 1, 5, 3]) == [(5, 2), (3, 3), (1, 1)]
+
+
+@pytest.mark.parametrize(['hist_algo', 'off_algo'],
+                         [(hist_nf, off_nf), (hist_ff, off_ff),
+                          (hist_bf, off_bf)])
+@pytest.mark.parametrize('dataset',
+                         ['_datasets/binpp/N4C1W1/N4C1W1_A.BPP.txt',
+                          '_datasets/binpp/N2C3W2/N2C3W2_B.BPP.txt',
+                          '_datasets/binpp-hard/HARD0.BPP.txt'])
+def test_same_bins(hist_algo, off_algo, dataset):
+    data = BinppReader(dataset).offline()
+    assert hist_algo()(data) == off_algo()(data)
+
+
+def test_pack_runs():
+    # 7 items of 40 with capacity 100: FirstFit keeps load + w < capacity
+    assert hist_ff().pack(100, [(40, 7)]) == \
+        [[40, 40], [40, 40], [40, 40], [40]]
+    assert hist_bf().pack(100, [(50, 3), (20, 4)]) == \
+        [[50, 50], [50, 20, 20], [20, 20]]
@@ -0,0 +1,24 @@
+from macpacking.algorithms.improved import Improved
+from macpacking.algorithms.offline import FirstFit, NextFit
+from macpacking.reader import BinppReader
+
+
+def test_improves_first_fit(weights, valid):
+    capacity, items = weights
+    solution = Improved(FirstFit, budget_ms=100)(weights)
+    assert len(solution) == 3
+    assert valid(capacity, items, solution)
+
+
+def test_never_worse(valid):
+    data = BinppReader('_datasets/binpp/N2C2W2/N2C2W2_A.BPP.txt').offline()
+    algo = Improved(NextFit(), budget_ms=20)
+    solution = algo(data)
+    assert len(solution) <= len([b for b in NextFit()(data) if b])
+    assert solution == algo.best
+    assert valid(*data, solution)
+
+
+def test_no_budget(weights):
+    # without a budget, the starting solution is returned as is
+    assert len(Improved(FirstFit, budget_ms=0)(weights)) == 4
@@ -0,0 +1,88 @@
+from macpacking.kpi import Welford, Kpis, kpis, KpiAccumulator
+from macpacking.solution import CompactSolution
+from macpacking.algorithms.offline import FirstFit as off_ff
+from macpacking.reader import JburkardtReader
+from statistics import mean, stdev
+from math import isnan
+import pytest
+
+
+def test_welford():
+    values = [3, 1, 4, 1, 5, 9, 2, 6]
+    stats = Welford()
+    for x in values:
+        stats.add(x)
+    assert stats.count == 8
+    assert stats.mean == pytest.approx(mean(values))
+    assert stats.std == pytest.approx(stdev(values))
+    assert (stats.min, stats.max) == (1, 9)
+
+
+def test_welford_merge():
+    left, right, both = Welford(), Welford(), Welford()
+    for x in range(10):
+        (left if x < 3 else right).add(x * x)
+        both.add(x * x)
+    left.merge(right).merge(Welford())
+    assert left.count == both.count
+    assert left.mean == pytest.approx(both.mean)
+    assert left.variance == pytest.approx(both.variance)
+    assert (left.min, left.max) == (0, 81)
+
+
+def test_welford_single():
+    stats = Welford()
+    stats.add(5)
+    assert isnan(stats.variance)
+
+
+def test_kpis():
+    data = JburkardtReader('_datasets/jburkardt/p04_').offline()
+    capacity, _ = data
+    solution = off_ff().compact(data)
+    loads = list(solution.loads)
+    result = kpis(solution.loads, capacity, 7)
+    assert result.bins == len(solution)
+    assert result.unused == pytest.approx(capacity - mean(loads))
+    assert result.load_std == pytest.approx(stdev(loads))
+    assert result.fill == pytest.approx(sum(loads) / (len(loads) * capacity))
+    assert result.waste == len(solution) - 7
+    assert (result.max_load, result.min_load) == (max(loads), min(loads))
+
+
+def test_kpis_empty():
+    result = kpis(CompactSolution().loads, 10)
+    assert result.bins == 0
+    assert isnan(result.unused)
+    assert isnan(kpis([5, 5], 10).waste)
+
+
+def test_accumulator():
+    solutions = [[8, 7, 5], [10, 9], [6]]
+    total = KpiAccumulator()
+    for loads in solutions:
+        total.add(kpis(loads, 10))
+    assert len(total) == 3
+    average = total.mean()
+    assert isinstance(average, Kpis)
+    assert average.bins == pytest.approx(2)
+    # the averages are the plain ones, printed unrounded by the benchmark
+    bins = KpiAccumulator()
+    for n in [29, 32, 34, 34, 34, 28]:
+        bins.add(kpis([1] * n, 10))
+    assert bins.mean().bins == sum([29, 32, 34, 34, 34, 28]) / 6
+    assert average.unused == pytest.approx(mean([10 - 20 / 3, 0.5, 4]))
+    # undefined values (one bin, no bound) are left out
+    assert total['load_std'].count == 2
+    assert isnan(average.waste)
+    assert total['max_load'].max == 10
+    assert total['min_load'].min == 5
+
+
+def test_accumulator_merge():
+    first, second = KpiAccumulator(), KpiAccumulator()
+    first.add(kpis([8, 7, 5], 10, 2))
+    second.add(kpis([10, 9], 10, 2))
+    first.merge(second)
+    assert len(first) == 2
+    assert first.mean().waste == pytest.approx(0.5)
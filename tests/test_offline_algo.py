@@ -2,8 +2,9 @@ from macpacking.algorithms.offline import (NextFit as off_nf,
                                            FirstFit as off_ff,
                                            BestFit as off_bf,
                                            WorstFit as off_wf,
-                                           GNP as gnp)
-from macpacking.model import ExtendOffline, Offline, BinPacker
+                                           GNP as gnp,
+                                           KarmarkarKarp as kk)
+from macpacking.model import ExtendOffline, Offline, BinPacker, Weights
 from macpacking.reader import DatasetReader, JburkardtReader
 import pytest
 
@@ -58,3 +59,26 @@ def run_extend_algo(algo: BinPacker, dataset: str, bin_num: int)\
 def test_extendoff_gnp(run_extend_algo):
     assert run_extend_algo == [[99, 46, 32, 19, 3],
                                [94, 50, 37, 18], [79, 64, 43, 7, 6]]
+
+
+@pytest.mark.parametrize(['algo', 'dataset', 'bin_num'],
+                         [(kk, '_datasets/jburkardt/p02_', 3)])
+def test_extendoff_kk(run_extend_algo):
+    assert run_extend_algo == [[18, 46, 32, 3, 6, 94],
+                               [50, 43, 7, 99], [79, 19, 64, 37]]
+    assert [sum(b) for b in run_extend_algo] == [199, 199, 199]
+
+
+def test_extendoff_kk_small():
+    assert kk()((0, [8, 7, 6, 5, 4]), 2) == [[4, 7, 5], [8, 6]]
+    assert kk()((0, [5]), 3) == [[5], [], []]
+
+
+@pytest.mark.parametrize('algo', [off_nf, off_ff, off_bf, off_wf])
+def test_shared_weights(algo):
+    capacity, weights = JburkardtReader('_datasets/jburkardt/p04_').offline()
+    shared = Weights(weights)
+    assert algo()((capacity, shared)) == algo()((capacity, weights))
+    # the decreasing order is sorted once and shared
+    assert shared.decreasing is shared.decreasing
+    assert list(shared) == weights
@@ -2,7 +2,8 @@ from macpacking.algorithms.online import (NextFit as on_nf,
                                           FirstFit as on_ff,
                                           BestFit as on_bf,
                                           WorstFit as on_wf,
-                                          RefinedFirstFit as on_rff)
+                                          RefinedFirstFit as on_rff,
+                                          WorstOnline as on_worst)
 from macpacking.model import Online, BinPacker
 from macpacking.reader import DatasetReader, JburkardtReader
 import pytest
@@ -49,3 +50,57 @@ def test_on_wf(run_algo):
 def test_on_rff(run_algo):
     assert run_algo == [[32, 6, 37, 3, 7], [43, 46],
                         [79, 19], [64, 18], [50], [99], [94]]
+
+
+@pytest.mark.parametrize('algo', [on_nf, on_ff, on_bf, on_wf, on_rff,
+                                  on_worst])
+def test_session(algo):
+    capacity, stream = JburkardtReader('_datasets/jburkardt/p02_').online()
+    weights = list(stream)
+    session = algo().open(capacity)
+    bin_ids = [session.push(w) for w in weights[:5]]
+    snapshot = session.snapshot()
+    for w in weights[5:]:
+        bin_ids.append(session.push(w))
+    solution = session.close()
+    assert solution == algo()((capacity, iter(weights)))
+    assert list(solution.assignment) == bin_ids
+    # the snapshot only sees the items pushed before it was taken
+    assert snapshot.size == 5
+    assert sum(snapshot.loads) == sum(weights[:5])
+    with pytest.raises(ValueError):
+        session.push(1)
+
+
+def test_rff_order():
+    # 10 does not fit the empty first bin, 6 does: the bins are listed
+    # in class order, the session numbers them as they are used
+    assert on_rff()((10, iter([10, 6]))) == [[6], [10]]
+    session = on_rff().open(10)
+    assert [session.push(10), session.push(6)] == [0, 1]
+    assert session.close() == [[10], [6]]
+    assert session.by_class() == [[6], [10]]
+    assert list(session.by_class().loads) == [6, 10]
+
+
+def test_session_unsupported():
+    class Greedy(Online):
+        def _process(self, capacity, stream):
+            return [[w] for w in stream]
+    with pytest.raises(NotImplementedError):
+        Greedy().open(100)
+    # the compact solution comes from _process
+    assert Greedy().compact((100, iter([5, 7]))).bins() == [[5], [7]]
+
+
+def test_snapshot_shares_buffers():
+    session = on_ff().open(10)
+    for w in [6, 6, 3]:
+        session.push(w)
+    snapshot = session.snapshot()
+    session.push(1)
+    assert snapshot.weights is session.solution.weights
+    assert len(snapshot) == 2
+    assert list(snapshot.loads) == [9, 6]
+    assert snapshot.bins() == [[6, 3], [6]]
+    assert list(session.solution.loads) == [9, 7]
@@ -0,0 +1,49 @@
+from macpacking.algorithms.portfolio import Portfolio, pool
+from macpacking.algorithms.offline import (NextFit, FirstFit,
+                                           BestFit as off_bf)
+from macpacking.algorithms.online import BestFit
+from macpacking.algorithms.exact import BranchAndBound
+from macpacking.algorithms.improved import Improved
+from macpacking.reader import BinppReader
+from time import perf_counter
+
+
+def test_fewest_bins(weights, valid):
+    capacity, items = weights
+    portfolio = Portfolio([NextFit, FirstFit, BestFit, BranchAndBound(1.0)],
+                          deadline_ms=5000)
+    solution = portfolio(weights)
+    assert len(solution) == 3
+    assert isinstance(portfolio.winner, BranchAndBound)
+    assert valid(capacity, items, solution)
+
+
+def test_default_portfolio(weights):
+    assert len(Portfolio(deadline_ms=2000)(weights)) == 3
+
+
+def test_pool_reused(weights):
+    Portfolio([FirstFit])(weights)
+    executor = pool()
+    Portfolio([FirstFit])(weights)
+    assert pool() is executor
+
+
+def test_deadline_expired(weights):
+    portfolio = Portfolio([BranchAndBound(1.0)], deadline_ms=0)
+    # no result in time: FirstFit decreasing is the fallback
+    assert len(portfolio(weights)) == 4
+    assert isinstance(portfolio.winner, FirstFit)
+
+
+def test_running_members_cancelled():
+    data = BinppReader('_datasets/binpp/N3C3W1/N3C3W1_E.BPP.txt').offline()
+    # the improvement stage cannot reach the lower bound of this instance
+    # and would keep its worker busy for its whole budget
+    slow = Portfolio([Improved(off_bf, budget_ms=20000)], deadline_ms=200)
+    slow(data)
+    start = perf_counter()
+    fast = Portfolio([FirstFit], deadline_ms=5000)
+    fast(data)
+    assert fast.winner is fast.algos[0]
+    assert perf_counter() - start < 2
@@ -1,4 +1,7 @@
-from macpacking.reader import DatasetReader, BinppReader, OracleReader
+from macpacking.reader import (DatasetReader, BinppReader, OracleReader,
+                               OracleRegistry, oracles, WeightLogReader,
+                               JburkardtReader, ORLibraryReader,
+                               read_weights, parse_numbers)
 import pytest
 
 
@@ -47,3 +50,90 @@ def test_jburkardt_oracle(create_reader):
     for key, value in create_reader.items():
         if key in optimal.keys():
             assert value == optimal[key]
+
+
+def test_oracle_registry():
+    registry = oracles()
+    assert registry is oracles()
+    # the jburkardt names are normalised
+    assert registry['p-01'] == registry['p01_'] == registry['p_01'] == 4
+    assert registry['_datasets/binpp/N1C1W1/N1C1W1_B.BPP.txt'] == 31
+    assert registry.lookup(['HARD0', 'N1C1W1_C', 'unknown']) == [56, 20, None]
+    assert 'unknown' not in registry
+    assert len(registry.dataset('binpp')) == 720
+    with pytest.raises(KeyError):
+        registry['unknown']
+    assert OracleRegistry.normalize('N1C1W1_A.BPP.txt') == 'N1C1W1_A'
+
+
+def test_seeded_orders():
+    dataset = '_datasets/binpp/N1C1W1/N1C1W1_B.BPP.txt'
+    reader = BinppReader(dataset)
+    capacity, weights = reader.mapped()
+    # the default order is the shuffled offline list
+    assert [weights[i] for i in reader.order()] == reader.offline()[1]
+    assert list(reader.stream(reader.order())[1]) == reader.offline()[1]
+    other = BinppReader(dataset, seed=7)
+    assert other.offline()[1] != reader.offline()[1]
+    assert list(reader.order(7)) == list(other.order())
+    orders = reader.orders(range(10))
+    assert len({tuple(o) for o in orders}) == 10
+    assert all(sorted(o) == list(range(len(weights))) for o in orders)
+
+
+def test_streaming():
+    reader = BinppReader('_datasets/binpp/N1C1W1/N1C1W1_B.BPP.txt')
+    capacity, weights = reader.mapped()
+    assert reader.streaming()[0] == capacity
+    assert list(reader.streaming()[1]) == weights.tolist()
+    shuffled = list(reader.streaming(window=8)[1])
+    assert shuffled != weights.tolist()
+    assert sorted(shuffled) == sorted(weights.tolist())
+    # an item cannot come out more than a window ahead of its position
+    position = {}
+    for k, w in enumerate(shuffled):
+        position.setdefault(w, []).append(k)
+    for i, w in enumerate(weights.tolist()):
+        assert max(position[w]) >= i - 8
+    jburkardt = JburkardtReader('_datasets/jburkardt/p02_')
+    assert list(jburkardt.streaming()[1]) == jburkardt.mapped()[1].tolist()
+
+
+def test_weight_log(tmp_path):
+    filename = tmp_path / 'weights.log'
+    filename.write_text('\n'.join(str(w) for w in range(1, 1001)) + '\n\n')
+    assert list(read_weights(str(filename), chunk_size=7)) == \
+        list(range(1, 1001))
+    reader = WeightLogReader(str(filename), 2000)
+    capacity, stream = reader.streaming(window=16)
+    assert capacity == 2000
+    assert sorted(stream) == list(range(1, 1001))
+    assert WeightLogReader(str(filename), 50).offline()[0] == 50
+
+
+def test_non_integral(tmp_path, monkeypatch):
+    filename = tmp_path / 'weights.log'
+    filename.write_text('3\n1.5\n2\n')
+    with pytest.raises(ValueError, match='Non-integral'):
+        WeightLogReader(str(filename), 10).offline()
+    monkeypatch.setattr(DatasetReader, 'cache', None)
+    with pytest.raises(ValueError, match='Non-integral'):
+        WeightLogReader(str(filename), 10).offline()
+
+
+def test_parse_numbers():
+    assert parse_numbers(b'3\n10\n 4\n5 6\n').tolist() == [3, 10, 4, 5, 6]
+    assert parse_numbers(b'1.0 2\n').dtype == 'int64'
+    assert parse_numbers(b'1.5 2\n').tolist() == [1.5, 2.0]
+    with pytest.raises(ValueError):
+        parse_numbers(b'1 two 3')
+
+
+def test_or_library(tmp_path):
+    filename = tmp_path / 'binpack.txt'
+    filename.write_text(' 2\n u4_00\n 10 4 2\n6\n4\n5\n5\n'
+                        ' t3_00\n 100.0 3 1\n 20.5\n 30.2\n 49.3\n')
+    reader = ORLibraryReader(str(filename))
+    assert list(reader) == [(10, [6, 4, 5, 5]), (100, [20.5, 30.2, 49.3])]
+    assert [name for name, _ in reader.instances()] == ['u4_00', 't3_00']
+    assert reader.best == {'u4_00': 2, 't3_00': 1}
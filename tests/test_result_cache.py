@@ -0,0 +1,69 @@
+from utils.result_cache import ResultCache
+from utils import algo_runner
+from utils.algo_runner import run_all
+from macpacking.algorithms.offline import FirstFit, BestFit
+from macpacking.algorithms.online import NextFit
+import importlib
+import pytest
+import sys
+
+
+@pytest.fixture
+def cache(tmp_path) -> ResultCache:
+    cache = ResultCache(str(tmp_path / 'results.sqlite'))
+    yield cache
+    cache.close()
+
+
+def test_resume(cache, monkeypatch):
+    jobs = [(FirstFit, 'jburkardt', [0] * 4), (NextFit, 'jburkardt', [0] * 4)]
+    results = run_all(jobs, cache=cache)
+    assert len(cache) == 8
+    runs = []
+
+    def run_instance(task):
+        runs.extend(algo for algo, _ in task[1])
+        return original(task)
+
+    original = algo_runner.run_instance
+    monkeypatch.setattr(algo_runner, 'run_instance', run_instance)
+    assert run_all(jobs, cache=cache) == results
+    assert runs == []
+    # a new algorithm only costs its own runs
+    jobs.append((BestFit, 'jburkardt', [0] * 4))
+    assert run_all(jobs, cache=cache)[:2] == results
+    assert runs == [BestFit] * 4
+    assert len(cache) == 12
+
+
+def test_keys(cache, tmp_path):
+    assert cache.algo_key(FirstFit) != cache.algo_key(BestFit)
+    assert cache.algo_key(FirstFit) == cache.algo_key(FirstFit)
+    instance = tmp_path / 'instance.txt'
+    instance.write_text('2\n10\n6\n4\n')
+    key = cache.instance_key([str(instance)])
+    instance.write_text('2\n10\n6\n3\n\n')
+    assert cache.instance_key([str(instance)]) != key
+
+
+def test_keys_outside_package(cache, tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    source = tmp_path / 'myalgo.py'
+    source.write_text('from macpacking.algorithms.offline import FirstFit\n'
+                      'class Greedy(FirstFit):\n    pass\n')
+    import myalgo
+    key = cache.algo_key(myalgo.Greedy)
+    source.write_text('from macpacking.algorithms.offline import FirstFit\n'
+                      'class Greedy(FirstFit):\n    budget = 3\n')
+    assert cache.algo_key(importlib.reload(myalgo).Greedy) != key
+    monkeypatch.delitem(sys.modules, 'myalgo')
+    # without a source file, the code of the methods is hashed
+    keys = []
+    for body in ['return 1', 'return 2']:
+        scope = {'__name__': '__main__'}     # as in a notebook
+        exec('from macpacking.algorithms.offline import FirstFit\n'
+             f'class Greedy(FirstFit):\n    def f(self):\n        {body}\n',
+             scope)
+        keys.append(cache.algo_key(scope['Greedy']))
+    assert keys[0] != keys[1]
@@ -0,0 +1,43 @@
+from macpacking.solution import CompactSolution, bin_loads
+from macpacking.algorithms.offline import FirstFit as off_ff
+from macpacking.algorithms.online import (NextFit as on_nf,
+                                          BestFit as on_bf,
+                                          WorstFit as on_wf,
+                                          RefinedFirstFit as on_rff)
+from macpacking.reader import JburkardtReader
+import pytest
+
+
+def test_from_bins():
+    bins = [[5, 3], [7], [2, 2, 1]]
+    solution = CompactSolution.from_bins(bins)
+    assert solution.count == 3
+    assert solution.size == 6
+    assert list(solution.loads) == [8, 7, 5]
+    assert list(solution.assignment) == [0, 0, 1, 2, 2, 2]
+    assert solution == bins
+    assert bin_loads(bins) == [8, 7, 5]
+
+
+def test_float_weights():
+    solution = CompactSolution()
+    index = solution.new_bin()
+    solution.place(2, index)
+    solution.place(0.5, index)
+    assert solution.loads[0] == 2.5
+    assert solution.bins() == [[2, 0.5]]
+
+
+@pytest.mark.parametrize('algo', [on_nf, on_bf, on_wf, on_rff])
+def test_online_compact(algo):
+    reader = JburkardtReader('_datasets/jburkardt/p02_')
+    solution = algo().compact(reader.online())
+    assert solution == algo()(reader.online())
+    assert list(bin_loads(solution)) == [sum(b) for b in solution]
+
+
+def test_offline_compact():
+    reader = JburkardtReader('_datasets/jburkardt/p02_')
+    solution = off_ff().compact(reader.offline())
+    assert len(solution) == 7
+    assert solution.bins() == off_ff()(reader.offline())
@@ -0,0 +1,50 @@
+from macpacking.algorithms.structures import ResidualTree, ResidualIndex
+
+
+def test_residual_tree_first_above():
+    tree = ResidualTree()
+    for residual in [3, 10, 7, 10, 1]:
+        tree.append(residual)
+    assert len(tree) == 5
+    assert tree.first_above(2) == 0
+    assert tree.first_above(3) == 1
+    assert tree.first_above(9) == 1
+    assert tree.first_above(10) == -1
+
+
+def test_residual_tree_update():
+    tree = ResidualTree()
+    for residual in [10, 10, 10]:
+        tree.append(residual)
+    tree[0] -= 8
+    tree[1] -= 5
+    assert tree[0] == 2
+    assert tree.first_above(5) == 2
+
+
+def test_residual_index_pop_best():
+    index = ResidualIndex()
+    for i, residual in enumerate([7, 3, 7, 12]):
+        index.add(i, residual)
+    # tightest bin first, highest index among equal residuals
+    assert index.pop_best(4) == (2, 7)
+    assert index.pop_best(4) == (0, 7)
+    assert index.pop_best(4) == (3, 12)
+    assert index.pop_best(4) == (-1, None)
+    assert len(index) == 1
+
+
+def test_bulk_insertions():
+    tree = ResidualTree()
+    tree.append(1)
+    tree.extend(6, 5)
+    assert len(tree) == 6
+    assert tree.first_above(5) == 1
+    tree[1] = 0
+    assert tree.first_above(5) == 2
+
+    index = ResidualIndex()
+    index.add(0, 6)
+    index.add_range(1, 4, 6)
+    assert index.pop_best(6) == (3, 6)
+    assert len(index) == 3
@@ -1,7 +1,14 @@
-from macpacking.model import Offline, Online, ExtendOffline, BinPacker
-from macpacking.reader import DatasetReader, BinppReader, JburkardtReader
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Iterator
+from macpacking.model import (Offline, Online, ExtendOffline, BinPacker,
+                              Weights)
+from macpacking.reader import (DatasetReader, BinppReader, JburkardtReader,
+                               SEED)
+from macpacking.solution import CompactSolution
+from macpacking.catalog import catalog, Catalog, Entry
 from utils.algo_util import get_algo_name
-import os
+from utils.result_cache import ResultCache
 
 
 def choose_reader(dataset: str) -> DatasetReader:
@@ -14,34 +21,34 @@ def choose_reader(dataset: str) -> DatasetReader:
         return JburkardtReader(dataset)
 
 
-def run_off(algo: Offline, dataset: str) -> list[list[int]]:
+def run_off(algo: Offline, dataset: str) -> CompactSolution:
     '''
         Run offline algorithms
     '''
     reader: DatasetReader = choose_reader(dataset)
     strategy: Offline = algo()
-    result = strategy(reader.offline())
+    result = strategy.compact(reader.offline())
     return result
 
 
-def run_on(algo: Online, dataset: str) -> list[list[int]]:
+def run_on(algo: Online, dataset: str) -> CompactSolution:
     '''
         Run online algorithms
     '''
     reader: DatasetReader = choose_reader(dataset)
     strategy: Online = algo()
-    result = strategy(reader.online())
+    result = strategy.compact(reader.online())
     return result
 
 
 def run_extend(algo: ExtendOffline, dataset: str,
-               bins: int) -> list[list[int]]:
+               bins: int) -> CompactSolution:
     '''
         Run extended offline algorithms
     '''
     reader: DatasetReader = choose_reader(dataset)
     strategy: ExtendOffline = algo()
-    result = strategy(reader.offline(), bins)
+    result = strategy.compact(reader.offline(), bins)
     return result
 
 
@@ -58,27 +65,103 @@ def run_algo(algo: BinPacker, dataset: str, **bins: dict[str: int]):
         return run_off(algo, dataset)
 
 
-def run_in_folder(algo: BinPacker, data_folder: str, bins: list[int])\
-        -> dict[str: list[list[int]]]:
+def run_in_folder(algo: BinPacker, data_folder: str, bins: list[int],
+                  workers: int = 1) -> dict[str: CompactSolution]:
     '''
         Run algorithm on all files in a folder
     '''
-    results = {}
-    data_folder = f'_datasets/{data_folder}'
-    files = os.listdir(data_folder)
-    # Run jburkardt dataset differently since the file names
-    # have different formats
-    if 'jburkardt' in data_folder:
-        path = set()
-        for f in files:
-            path.add(f'_datasets/jburkardt/{f.split("_")[0]}_')
-        path.remove('_datasets/jburkardt/_')
-        for i, f in enumerate(path):
-            # Add path in proper format (e.g., p01_)
-            subs = f.split('/')[-1].strip('_')
-            results[f'{subs[0]}-{subs[1:]}'] = run_algo(algo, f, bins=bins[i])
+    return run_all([(algo, data_folder, bins)], workers)[0]
+
+
+def run_all(jobs: list[tuple[BinPacker, str, list[int]]],
+            workers: int = 1, cache: ResultCache = None,
+            runtimes: list[dict[str: float]] = None) \
+        -> list[dict[str: CompactSolution]]:
+    '''
+        Run several (algorithm, folder, bins) jobs, one result dict per
+        job. The runs are instance-major: every instance is read and
+        shuffled once, then given to all the algorithms of the jobs on
+        its folder. With more than one worker, the instances are spread
+        in chunks over a process pool; results come back in the order of
+        a serial run. Folders the catalog does not index are scanned
+        (and must exist under _datasets). With a cache, only the cells it
+        misses are run, and each one is stored as soon as its instance is
+        done. The runtimes list, when given, receives the seconds taken by
+        each run.
+    '''
+    folders: dict[str, list[int]] = {}
+    for index, (_, data_folder, _) in enumerate(jobs):
+        folders.setdefault(data_folder, []).append(index)
+    results = [{} for _ in jobs]
+    if runtimes is None:
+        runtimes = [{} for _ in jobs]
+    tasks, owners = [], []
+    for data_folder, indices in folders.items():
+        entries = catalog().folder(data_folder) or \
+            Catalog.scan(data_folder)
+        for i, entry in enumerate(entries):
+            missing = []
+            for j in indices:
+                algo, bins = jobs[j][0], jobs[j][2][i]
+                cached = None if cache is None else \
+                    cache.get(algo, entry.files, SEED, bins)
+                # the slots keep the order of the serial run
+                results[j][entry.key], runtimes[j][entry.key] = \
+                    cached if cached is not None else (None, None)
+                if cached is None:
+                    missing.append(j)
+            if missing:
+                tasks.append((entry.path, [(jobs[j][0], jobs[j][2][i])
+                                           for j in missing]))
+                owners.append((entry, i, missing))
+    if workers > 1 and len(tasks) > 1:
+        # a few chunks per worker keep the pool busy with little IPC
+        chunksize = max(1, len(tasks) // (4 * workers))
+        with ProcessPoolExecutor(workers) as executor:
+            done = executor.map(run_instance, tasks, chunksize=chunksize)
+            _collect(jobs, owners, done, results, runtimes, cache)
     else:
-        for i, f in enumerate(files):
-            path = f'{data_folder}/{f}'
-            results[f.split('.')[0]] = run_algo(algo, path, bins=bins[i])
+        done = map(run_instance, tasks)
+        _collect(jobs, owners, done, results, runtimes, cache)
     return results
+
+
+def _collect(jobs: list[tuple[BinPacker, str, list[int]]],
+             owners: list[tuple[Entry, int, list[int]]],
+             done: Iterator[list[tuple[CompactSolution, float]]],
+             results: list[dict[str: CompactSolution]],
+             runtimes: list[dict[str: float]],
+             cache: ResultCache) -> None:
+    # place the solutions of each instance, in order, as they arrive
+    for (entry, i, missing), runs in zip(owners, done):
+        for j, (solution, runtime) in zip(missing, runs):
+            results[j][entry.key] = solution
+            runtimes[j][entry.key] = runtime
+            if cache is not None:
+                cache.put(jobs[j][0], entry.files, SEED, jobs[j][2][i],
+                          solution, runtime)
+
+
+def run_instance(task: tuple[str, list[tuple[BinPacker, int]]]) \
+        -> list[tuple[CompactSolution, float]]:
+    '''
+        Run (algorithm, bins) pairs on one instance, read once: every
+        algorithm gets the same shuffled weights, and the offline ones
+        share one sorted copy. Each solution comes with its runtime, in
+        seconds.
+    '''
+    dataset, runs = task
+    capacity, weights = choose_reader(dataset).offline()
+    weights = Weights(weights)
+    solutions = []
+    for algo, bins in runs:
+        name = get_algo_name(algo)
+        start = perf_counter()
+        if 'Online' in name:
+            solution = algo().compact((capacity, iter(weights)))
+        elif 'ExtendOffline' in name:
+            solution = algo().compact((capacity, weights), bins)
+        elif 'Offline' in name:
+            solution = algo().compact((capacity, weights))
+        solutions.append((solution, perf_counter() - start))
+    return solutions
@@ -0,0 +1,123 @@
+from hashlib import sha1
+from types import ModuleType
+from macpacking.model import BinPacker
+from macpacking.solution import CompactSolution
+from utils.algo_util import get_algo_name
+import inspect
+import marshal
+import os
+import pickle
+import sqlite3
+import sys
+
+
+class ResultCache():
+    '''
+        Persistent cache of algorithm results, in a SQLite file. A cell is
+        keyed by the algorithm (its name and a hash of the source of its
+        classes, wherever they are defined, and of the macpacking modules
+        it uses), the content of the instance files,
+        the reader seed and the number of bins of the extended problem.
+        Editing an algorithm or an instance invalidates its cells only,
+        and every cell is saved as soon as it is computed.
+    '''
+
+    def __init__(self, filename: str = '_cache/results.sqlite') -> None:
+        folder = os.path.dirname(filename)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.__db = sqlite3.connect(filename)
+        self.__db.execute('''CREATE TABLE IF NOT EXISTS results (
+            algo TEXT, instance TEXT, seed INTEGER, bins INTEGER,
+            solution BLOB, runtime REAL,
+            PRIMARY KEY (algo, instance, seed, bins))''')
+        columns = [c[1] for c in
+                   self.__db.execute('PRAGMA table_info(results)')]
+        if 'runtime' not in columns:
+            # caches written before runtimes were recorded
+            self.__db.execute('ALTER TABLE results ADD COLUMN runtime REAL')
+        self.__algos: dict[BinPacker, str] = {}
+        self.__instances: dict[tuple, str] = {}
+
+    def get(self, algo: BinPacker, files: list[str], seed: int,
+            bins: int) -> tuple[CompactSolution, float]:
+        '''Cached solution and runtime of a cell, None when missing'''
+        row = self.__db.execute(
+            'SELECT solution, runtime FROM results WHERE algo = ? '
+            'AND instance = ? AND seed = ? AND bins = ?',
+            (self.algo_key(algo), self.instance_key(files), seed, bins)
+        ).fetchone()
+        return (pickle.loads(row[0]), row[1]) if row is not None else None
+
+    def put(self, algo: BinPacker, files: list[str], seed: int, bins: int,
+            solution: CompactSolution, runtime: float = None) -> None:
+        self.__db.execute(
+            'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+            (self.algo_key(algo), self.instance_key(files), seed, bins,
+             pickle.dumps(solution), runtime))
+        self.__db.commit()
+
+    def __len__(self) -> int:
+        return self.__db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self) -> None:
+        self.__db.close()
+
+    def algo_key(self, algo: BinPacker) -> str:
+        '''Name of the algorithm and hash of the sources it depends on'''
+        if algo not in self.__algos:
+            digest = sha1()
+            # classes defined out of macpacking, e.g. in a user module or
+            # a notebook cell, are not covered by the modules below
+            for c in algo.__mro__[:-1]:     # all but object
+                digest.update(_class_source(c))
+            modules = sorted(_dependencies(algo), key=lambda m: m.__name__)
+            for module in modules:
+                digest.update(module.__name__.encode())
+                digest.update(inspect.getsource(module).encode())
+            self.__algos[algo] = \
+                f'{get_algo_name(algo)}:{algo.__module__}:{digest.hexdigest()}'
+        return self.__algos[algo]
+
+    def instance_key(self, files: list[str]) -> str:
+        '''Hash of the content of the instance files'''
+        stamp = tuple((f, os.stat(f).st_mtime_ns, os.stat(f).st_size)
+                      for f in files)
+        if stamp not in self.__instances:
+            digest = sha1()
+            for f in files:
+                with open(f, 'rb') as content:
+                    digest.update(content.read())
+            self.__instances[stamp] = digest.hexdigest()
+        return self.__instances[stamp]
+
+
+def _class_source(cls: type) -> bytes:
+    # source of a class, or the code of its methods when the source is
+    # not available (e.g. a class created by exec)
+    try:
+        return inspect.getsource(cls).encode()
+    except (OSError, TypeError):
+        code = [marshal.dumps(f.__code__) for f in vars(cls).values()
+                if hasattr(f, '__code__')]
+        return cls.__qualname__.encode() + b''.join(code)
+
+
+def _dependencies(algo: BinPacker) -> set[ModuleType]:
+    # macpacking modules of the algorithm's class hierarchy, and the ones
+    # they use, transitively
+    modules = [sys.modules[c.__module__] for c in algo.__mro__
+               if c.__module__.startswith('macpacking')]
+    seen = set()
+    while modules:
+        module = modules.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        for value in vars(module).values():
+            name = value.__name__ if isinstance(value, ModuleType) \
+                else getattr(value, '__module__', None)
+            if isinstance(name, str) and name.startswith('macpacking') \
+                    and name in sys.modules:
+                modules.append(sys.modules[name])
+    return seen